@@ -2,10 +2,17 @@
 GitHub AI Analyzer - Main package
 """
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "GitHub AI Analyzer Team"
 
-# Import subpackages to make them available when importing the app package
-from . import agents
-from . import core
-from . import utils
\ No newline at end of file
+# Subpackages are imported on first attribute access (PEP 562) so that entry
+# points which only need one of them don't pay for the others at startup
+_SUBPACKAGES = ("agents", "core", "utils")
+
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,5 +2,15 @@
 Agent modules for GitHub AI Analyzer
 """
 
-# Make key agent classes available at the package level
-from .code_review_agent import CodeReviewAgent
\ No newline at end of file
+import importlib
+
+# Make key agent classes available at the package level, loaded on first use
+_EXPORTS = {
+    "CodeReviewAgent": ".code_review_agent",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,19 @@
-from crewai import Agent
-from langchain.memory import ConversationBufferMemory
-from app.core.config import settings
-from typing import Dict, Any, Optional
+from app.core.config import get_settings
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from functools import lru_cache
+
+if TYPE_CHECKING:
+    from langchain.memory import ConversationBufferWindowMemory
+
+@lru_cache(maxsize=1)
+def _llm_config() -> Dict[str, Any]:
+    """LLM settings shared by every agent, parsed once on first use."""
+    settings = get_settings()
+    return {
+        "model": settings.CREWAI_MODEL,
+        "temperature": float(settings.CREWAI_TEMPERATURE),
+        "max_tokens": int(settings.CREWAI_MAX_TOKENS)
+    }
 
 class BaseAgent:
     def __init__(
@@ -11,30 +23,45 @@ class BaseAgent:
         backstory: str,
         verbose: bool = True,
         allow_delegation: bool = False,
-        memory: bool = True
+        memory: bool = True,
+        memory_window: int = 8
     ):
         """Initialize the base agent with CrewAI configuration."""
-        # Initialize memory if enabled
-        agent_memory = None
+        # Initialize memory if enabled, keeping only the last few exchanges
+        # so the prompt size stays bounded over a long session. Memory is
+        # stateful, so it belongs to this instance rather than the shared agent.
+        self.memory = None
         if memory:
-            agent_memory = ConversationBufferMemory(
+            from langchain.memory import ConversationBufferWindowMemory
+            self.memory = ConversationBufferWindowMemory(
+                k=memory_window,
                 memory_key="chat_history",
                 return_messages=True
             )
 
-        # Create the CrewAI agent
-        self.agent = Agent(
+        # Reuse the CrewAI agent for this role across instances
+        self.agent = self._build_agent(role, goal, backstory, verbose, allow_delegation)
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _build_agent(
+        role: str,
+        goal: str,
+        backstory: str,
+        verbose: bool,
+        allow_delegation: bool
+    ):
+        """Create the CrewAI agent for a role; cached so reruns don't rebuild it."""
+        # CrewAI is slow to import, so load it only when an agent is built
+        from crewai import Agent
+        
+        return Agent(
             role=role,
             goal=goal,
             backstory=backstory,
             verbose=verbose,
             allow_delegation=allow_delegation,
-            memory=agent_memory,
-            llm_config={
-                "model": settings.CREWAI_MODEL,
-                "temperature": float(settings.CREWAI_TEMPERATURE),
-                "max_tokens": int(settings.CREWAI_MAX_TOKENS)
-            }
+            llm_config=dict(_llm_config())
         )
 
     async def execute_task(self, task: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -57,11 +84,11 @@ class BaseAgent:
                 "error": str(e)
             }
     
-    def get_memory(self) -> Optional[ConversationBufferMemory]:
+    def get_memory(self) -> Optional["ConversationBufferWindowMemory"]:
         """Get the agent's memory"""
-        return self.agent.memory
+        return self.memory
     
     def clear_memory(self):
         """Clear the agent's memory"""
-        if self.agent.memory:
-            self.agent.memory.clear() 
\ No newline at end of file
+        if self.memory:
+            self.memory.clear() 
\ No newline at end of file
@@ -1,19 +1,241 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import ast
+import asyncio
 import json
 import os
-from app.core.config import settings
+import hashlib
+from collections import OrderedDict
+from app.core.config import get_settings
 from app.core.model_manager import ModelManager
 import logging
 import re
+from bisect import bisect_right
+from itertools import accumulate
 from datetime import datetime
-import streamlit as st
+try:
+    import re2
+except ImportError:  # optional: linear-time matching for the fused rule scans
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional; literal rules fall back to str.find
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+_st_module = None
+
+
+def _st():
+    """Import Streamlit on first use so non-UI callers don't pay for it."""
+    global _st_module
+    if _st_module is None:
+        import streamlit
+        _st_module = streamlit
+    return _st_module
+
+# Static-analysis patterns are compiled once at import so each check only
+# has to run the matcher instead of going through the re module cache.
+_COMPLEXITY_PATTERN = re.compile(r"\b(?:if|for|while|switch|catch)\s*\(")
+
+# Python AST nodes that open a decision point
+_PYTHON_BRANCH_NODES = (
+    ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While,
+    ast.Try, ast.With, ast.AsyncWith, ast.BoolOp, ast.comprehension
+)
+
+_PYTHON_IMPORT_PATTERN = re.compile(r"(?m)^[ \t]*(?:from|import)\s+(\w+)")
+_JS_DEPENDENCY_PATTERN = re.compile(
+    r"require\(['\"]([^'\"]+)['\"]\)|import\s+(?:from\s+)?['\"]([^'\"]+)['\"]"
+)
+
+_TEST_PATTERNS = {
+    "python": [
+        re.compile(r"def\s+test_", re.IGNORECASE),
+        re.compile(r"class\s+Test", re.IGNORECASE),
+        re.compile(r"pytest", re.IGNORECASE),
+        re.compile(r"unittest", re.IGNORECASE)
+    ],
+    "javascript": [
+        re.compile(r"test\(", re.IGNORECASE),
+        re.compile(r"describe\(", re.IGNORECASE),
+        re.compile(r"it\(", re.IGNORECASE),
+        re.compile(r"jest", re.IGNORECASE)
+    ]
+}
+
+# Rule tables are (tag, pattern, message); each language's rules are fused
+# into one alternation of named groups so the code is scanned once per
+# category and the matching rule is recovered from ``match.lastgroup``.
+_SECURITY_RULES = {
+    "python": [
+        ("eval", r"eval\(", "Use of eval() is dangerous"),
+        ("exec", r"exec\(", "Use of exec() is dangerous"),
+        ("os_system", r"os\.system\(", "Use of os.system() is dangerous"),
+        ("subprocess_call", r"subprocess\.call\(", "Use of subprocess.call() is dangerous"),
+        ("pickle_loads", r"pickle\.loads\(", "Use of pickle.loads() is dangerous")
+    ],
+    "javascript": [
+        ("eval", r"eval\(", "Use of eval() is dangerous"),
+        ("new_function", r"new\s+Function\(", "Use of Function constructor is dangerous"),
+        ("inner_html", r"innerHTML\s*=", "Use of innerHTML is dangerous"),
+        ("document_write", r"document\.write\(", "Use of document.write() is dangerous")
+    ]
+}
+
+_PERFORMANCE_RULES = {
+    "python": [
+        ("range_len", r"for\s+.*\s+in\s+range\(len\(", "Use enumerate() instead of range(len())"),
+        ("string_concat", r"\+\s*=\s*['\"]\w+['\"]", "Use list comprehension or join() for string concatenation"),
+        ("append_loop", r"\.append\(.*\)\s*for\s+.*\s+in", "Use list comprehension instead of loop with append()")
+    ],
+    "javascript": [
+        ("var_loop", r"for\s*\(\s*var\s+i", "Use let instead of var in for loops"),
+        ("foreach_function", r"\.forEach\(\s*function\s*\(", "Use arrow function in forEach"),
+        ("get_elements_by", r"document\.getElementsBy", "Use querySelector for better performance")
+    ]
+}
+
+_MAINTAINABILITY_RULES = {
+    "python": [
+        ("long_signature", r"def\s+\w+\s*\([^)]{120,}\)", "Function signature is too long"),
+        ("complex_conditional", r"if.*(?:and|or).*(?:and|or)", "Complex conditional statement"),
+        ("global_variable", r"global\s+\w+", "Use of global variables")
+    ],
+    "javascript": [
+        ("long_signature", r"function\s*\([^)]{120,}\)", "Function signature is too long"),
+        ("complex_conditional", r"if.*&&.*&&", "Complex conditional statement"),
+        ("function_expression", r"var\s+\w+\s*=\s*function", "Use const/let and arrow functions")
+    ]
+}
+
+# A backslash followed by any character, i.e. an escaped literal
+_ESCAPE_PATTERN = re.compile(r"\\(.)")
+
+def _as_literal(regex: str) -> Optional[str]:
+    """Return the plain string a rule matches if it has no regex syntax, else None."""
+    literal = _ESCAPE_PATTERN.sub(r"\1", regex)
+    return literal if re.escape(literal) == regex else None
+
+def _compile_fused(regex: str) -> re.Pattern:
+    """
+    Compile a fused rule pattern with RE2 when it is installed. RE2 matches in
+    linear time, so the ``.*`` rules can't backtrack on long lines; anything
+    RE2 can't parse falls back to re.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(regex)
+        except re2.error:
+            pass
+    return re.compile(regex)
+
+def _compile_rules(rules: Dict[str, List[Tuple[str, str, str]]]) -> Dict[str, Tuple[Optional[re.Pattern], List[Tuple[str, str]], Dict[str, str]]]:
+    """
+    Split each language's rules into plain substrings, matched with str.find,
+    and true regexes, fused into a single pattern; plus a tag -> message table.
+    """
+    compiled = {}
+    for language, entries in rules.items():
+        literals = []
+        regexes = []
+        for tag, regex, _ in entries:
+            literal = _as_literal(regex)
+            if literal is not None:
+                literals.append((tag, literal))
+            else:
+                regexes.append(f"(?P<{tag}>{regex})")
+        pattern = _compile_fused("|".join(regexes)) if regexes else None
+        compiled[language] = (pattern, literals, {tag: message for tag, _, message in entries})
+    return compiled
+
+def _find_all(code: str, literal: str) -> List[int]:
+    """Return the start offset of every occurrence of ``literal`` in ``code``."""
+    positions = []
+    start = code.find(literal)
+    while start != -1:
+        positions.append(start)
+        start = code.find(literal, start + len(literal))
+    return positions
+
+def _line_starts(code: str) -> List[int]:
+    """Return the offset at which each line of ``code`` starts."""
+    line_starts = [0]
+    line_starts.extend(accumulate(len(line) for line in code.splitlines(True)))
+    return line_starts
+
+# Analysis results keyed by a digest of (code, language, context); shared
+# across agent instances and evicted least-recently-used first
+ANALYSIS_CACHE_SIZE = 128
+_analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Model responses larger than this are parsed off the event loop
+JSON_OFFLOAD_THRESHOLD = 64 * 1024  # characters
+
+_SECURITY_PATTERNS = _compile_rules(_SECURITY_RULES)
+_PERFORMANCE_PATTERNS = _compile_rules(_PERFORMANCE_RULES)
+_MAINTAINABILITY_PATTERNS = _compile_rules(_MAINTAINABILITY_RULES)
+
+# Compiled rule sets keyed by the issue type they report
+_RULE_CATEGORIES = {
+    "security": _SECURITY_PATTERNS,
+    "performance": _PERFORMANCE_PATTERNS,
+    "maintainability": _MAINTAINABILITY_PATTERNS
+}
+
+def _build_literal_automata() -> Dict[str, Any]:
+    """Build one Aho-Corasick automaton per language over every category's literal rules."""
+    if ahocorasick is None:
+        return {}
+    
+    entries = {}
+    for category, compiled in _RULE_CATEGORIES.items():
+        for language, (_, literals, _) in compiled.items():
+            for tag, literal in literals:
+                entries.setdefault(language, {}).setdefault(literal, []).append((category, tag))
+    
+    automata = {}
+    for language, words in entries.items():
+        automaton = ahocorasick.Automaton()
+        for literal, owners in words.items():
+            automaton.add_word(literal, (len(literal), tuple(owners)))
+        automaton.make_automaton()
+        automata[language] = automaton
+    return automata
+
+_LITERAL_AUTOMATA = _build_literal_automata()
+
+def _find_literals(code: str, language: str) -> Dict[str, Dict[str, List[int]]]:
+    """Locate every literal rule for a language in one pass: category -> tag -> offsets."""
+    hits = {category: {} for category in _RULE_CATEGORIES}
+    automaton = _LITERAL_AUTOMATA.get(language.lower())
+    if automaton is not None:
+        for end, (length, owners) in automaton.iter(code):
+            for category, tag in owners:
+                hits[category].setdefault(tag, []).append(end - length + 1)
+        return hits
+    
+    for category, compiled in _RULE_CATEGORIES.items():
+        rule_set = compiled.get(language.lower())
+        if rule_set is None:
+            continue
+        for tag, literal in rule_set[1]:
+            found = _find_all(code, literal)
+            if found:
+                hits[category][tag] = found
+    return hits
+
 class CodeReviewAgent:
-    def __init__(self):
-        """Initialize the CodeReviewAgent with advanced capabilities."""
-        self.model_manager = ModelManager()
+    def __init__(self, model_manager: Optional[ModelManager] = None):
+        """
+        Initialize the CodeReviewAgent with advanced capabilities.
+        
+        Args:
+            model_manager: Manager for model config and usage tracking; share
+                the one usage is reported from, or a private one is created
+        """
+        self.model_manager = model_manager or ModelManager()
     
     async def analyze_code(self, 
                           code: str, 
@@ -30,28 +252,32 @@ class CodeReviewAgent:
         Returns:
             Dictionary containing analysis results
         """
+        cache_key = self._analysis_cache_key(code, language, context)
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            _analysis_cache.move_to_end(cache_key)
+            return dict(cached)
+        
         try:
-            with st.spinner("Analyzing code..."):
+            with _st().spinner("Analyzing code..."):
                 # Get model configuration
                 model_config = self.model_manager.get_model_config("code_analysis")
                 
                 # Prepare the prompt
                 prompt = self._prepare_analysis_prompt(code, language, context)
                 
-                # Get analysis from model
-                analysis_result = await self._get_model_analysis(prompt, model_config)
+                # Static checks are CPU-bound; run them in a worker thread while
+                # the model call is in flight
+                analysis_result, static_results = await asyncio.gather(
+                    self._get_model_analysis(prompt, model_config),
+                    asyncio.to_thread(self._run_static_checks, code, language, context)
+                )
                 
                 # Extract and structure the results
                 results = {
                     "timestamp": datetime.now().isoformat(),
                     "language": language,
-                    "metrics": self._extract_metrics(code, language),
-                    "complexity": self._calculate_complexity(code, language),
-                    "dependencies": self._extract_dependencies(code, language),
-                    "test_coverage": self._estimate_test_coverage(code, language),
-                    "security_issues": self._check_security(code, language),
-                    "performance_issues": self._check_performance(code, language),
-                    "maintainability": self._check_maintainability(code, language),
+                    **static_results,
                     "quality_issues": self._extract_quality_issues(analysis_result),
                     "security_vulnerabilities": self._extract_security_vulnerabilities(analysis_result),
                     "performance_optimizations": self._extract_performance_issues(analysis_result),
@@ -61,22 +287,83 @@ class CodeReviewAgent:
                 }
                 
                 # Track model usage
-                self.model_manager.track_usage("code_analysis", len(prompt.split()))
+                self.model_manager.record_usage("code_analysis", len(prompt.split()))
                 
-                return results
+                # Only cache complete analyses so a failed model call is retried
+                if analysis_result:
+                    _analysis_cache[cache_key] = results
+                    if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                        _analysis_cache.popitem(last=False)
+                
+                return dict(results)
                 
         except Exception as e:
             logger.error(f"Error in code analysis: {str(e)}")
-            st.error(f"Error analyzing code: {str(e)}")
+            _st().error(f"Error analyzing code: {str(e)}")
             return {
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
 
+    def _run_static_checks(self,
+                           code: str,
+                           language: str,
+                           context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run the synchronous metric and rule checks for a piece of code."""
+        # Offsets of each line, shared by the rule checks for line numbers
+        line_starts = _line_starts(code)
+        
+        # Literal rules of every category are located in a single pass
+        literal_hits = _find_literals(code, language)
+        
+        # Computed once and shared by the metrics summary and the top-level keys
+        complexity = self._calculate_complexity(code, language)
+        dependencies = self._extract_dependencies(code, language)
+        test_coverage = self._estimate_test_coverage(code, language, context)
+        
+        return {
+            "metrics": self._extract_metrics(code, language, complexity, dependencies, test_coverage),
+            "complexity": complexity,
+            "dependencies": dependencies,
+            "test_coverage": test_coverage,
+            "security_issues": self._check_security(code, language, line_starts, literal_hits["security"]),
+            "performance_issues": self._check_performance(code, language, line_starts, literal_hits["performance"]),
+            "maintainability": self._check_maintainability(code, language, line_starts, literal_hits["maintainability"])
+        }
+
+    async def analyze_codes_batch(self,
+                                  items: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several pieces of code concurrently.
+        
+        Model calls are issued together, bounded by LLM_MAX_CONCURRENCY, so
+        the backend can batch them instead of serving one request at a time.
+        
+        Args:
+            items: (code, language, context) tuples to analyze
+            
+        Returns:
+            Analysis results in the same order as ``items``
+        """
+        semaphore = asyncio.Semaphore(get_settings().LLM_MAX_CONCURRENCY)
+        
+        async def analyze(code: str, language: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_code(code, language, context)
+        
+        return await asyncio.gather(*(analyze(code, language, context) for code, language, context in items))
+
+    def _analysis_cache_key(self, code: str, language: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Build a stable cache key for an analysis request."""
+        digest = hashlib.blake2b(code.encode("utf-8"), digest_size=16)
+        digest.update(language.lower().encode("utf-8"))
+        digest.update(json.dumps(context, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
     def _prepare_analysis_prompt(self, code: str, language: str, context: Optional[Dict[str, Any]] = None) -> str:
         """Prepare the analysis prompt."""
-        prompt = self.model_manager.get_model_prompt("code_analysis")
-        return prompt.format(
+        return self.model_manager.render_prompt(
+            "code_analysis",
             code=code,
             language=language,
             context=json.dumps(context) if context else "{}"
@@ -87,18 +374,26 @@ class CodeReviewAgent:
         try:
             # Use the model manager to get the response
             response = await self.model_manager.get_completion(prompt, model_config)
+            if len(response) > JSON_OFFLOAD_THRESHOLD:
+                # A large parse is one long C call; keep the loop serving the UI meanwhile
+                return await asyncio.to_thread(json.loads, response)
             return json.loads(response)
         except Exception as e:
             logger.error(f"Error getting model analysis: {str(e)}")
             return {}
 
-    def _extract_metrics(self, code: str, language: str) -> Dict[str, Any]:
-        """Extract code metrics."""
+    def _extract_metrics(self,
+                         code: str,
+                         language: str,
+                         complexity: Optional[Dict[str, Any]] = None,
+                         dependencies: Optional[List[str]] = None,
+                         test_coverage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract code metrics, reusing any sub-results the caller already computed."""
         metrics = {
             "lines_of_code": len(code.splitlines()),
-            "complexity": self._calculate_complexity(code, language),
-            "dependencies": self._extract_dependencies(code, language),
-            "test_coverage": self._estimate_test_coverage(code, language)
+            "complexity": complexity if complexity is not None else self._calculate_complexity(code, language),
+            "dependencies": dependencies if dependencies is not None else self._extract_dependencies(code, language),
+            "test_coverage": test_coverage if test_coverage is not None else self._estimate_test_coverage(code, language)
         }
         return metrics
 
@@ -111,16 +406,19 @@ class CodeReviewAgent:
         }
         
         # Basic cyclomatic complexity calculation
-        control_structures = [
-            r"if\s*\([^)]*\)",
-            r"for\s*\([^)]*\)",
-            r"while\s*\([^)]*\)",
-            r"switch\s*\([^)]*\)",
-            r"catch\s*\([^)]*\)"
-        ]
+        tree = None
+        if language.lower() == "python":
+            try:
+                tree = ast.parse(code)
+            except SyntaxError:
+                pass
         
-        for structure in control_structures:
-            complexity["cyclomatic"] += len(re.findall(structure, code))
+        if tree is not None:
+            complexity["cyclomatic"] += sum(
+                1 for node in ast.walk(tree) if isinstance(node, _PYTHON_BRANCH_NODES)
+            )
+        else:
+            complexity["cyclomatic"] += len(_COMPLEXITY_PATTERN.findall(code))
         
         # Add 1 for the main function
         complexity["cyclomatic"] += 1
@@ -133,43 +431,42 @@ class CodeReviewAgent:
         
         if language.lower() == "python":
             # Extract import statements
-            imports = re.findall(r"^(?:from|import)\s+(\w+)", code, re.MULTILINE)
-            dependencies.extend(imports)
+            dependencies = _PYTHON_IMPORT_PATTERN.findall(code)
         elif language.lower() == "javascript":
-            # Extract require/import statements
-            requires = re.findall(r"require\(['\"]([^'\"]+)['\"]\)", code)
-            imports = re.findall(r"import\s+(?:from\s+)?['\"]([^'\"]+)['\"]", code)
-            dependencies.extend(requires + imports)
+            # Extract require/import statements in one pass
+            dependencies = [
+                required or imported
+                for required, imported in _JS_DEPENDENCY_PATTERN.findall(code)
+            ]
             
-        return list(set(dependencies))
+        # De-duplicate, keeping the order in which dependencies first appear
+        return list(dict.fromkeys(dependencies))
 
-    def _estimate_test_coverage(self, code: str, language: str) -> Dict[str, Any]:
-        """Estimate test coverage based on code analysis."""
+    def _estimate_test_coverage(self,
+                                code: str,
+                                language: str,
+                                context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Estimate test coverage. A repository-level ``test_file_ratio`` in the
+        context (test files / source files) is used when available; otherwise
+        the code itself is searched for test markers.
+        """
         coverage = {
             "unit_tests": 0,
             "integration_tests": 0,
             "total_coverage": 0
         }
         
-        # Look for test files and test functions
-        test_patterns = {
-            "python": [
-                r"def\s+test_",
-                r"class\s+Test",
-                r"pytest",
-                r"unittest"
-            ],
-            "javascript": [
-                r"test\(",
-                r"describe\(",
-                r"it\(",
-                r"jest"
-            ]
-        }
+        test_file_ratio = (context or {}).get("test_file_ratio")
+        if test_file_ratio is not None:
+            coverage["test_file_ratio"] = test_file_ratio
+            coverage["total_coverage"] = min(100, round(test_file_ratio * 100))
+            return coverage
         
-        patterns = test_patterns.get(language.lower(), [])
+        # Look for test files and test functions
+        patterns = _TEST_PATTERNS.get(language.lower(), [])
         for pattern in patterns:
-            matches = re.findall(pattern, code, re.IGNORECASE)
+            matches = pattern.findall(code)
             coverage["unit_tests"] += len(matches)
         
         # Estimate total coverage based on test presence
@@ -178,110 +475,75 @@ class CodeReviewAgent:
         
         return coverage
 
-    def _check_security(self, code: str, language: str) -> List[Dict[str, Any]]:
+    def _check_security(self,
+                        code: str,
+                        language: str,
+                        line_starts: Optional[List[int]] = None,
+                        literal_hits: Optional[Dict[str, List[int]]] = None) -> List[Dict[str, Any]]:
         """Check for security vulnerabilities."""
-        security_issues = []
-        
-        # Common security patterns to check
-        security_patterns = {
-            "python": [
-                (r"eval\(", "Use of eval() is dangerous"),
-                (r"exec\(", "Use of exec() is dangerous"),
-                (r"os\.system\(", "Use of os.system() is dangerous"),
-                (r"subprocess\.call\(", "Use of subprocess.call() is dangerous"),
-                (r"pickle\.loads\(", "Use of pickle.loads() is dangerous")
-            ],
-            "javascript": [
-                (r"eval\(", "Use of eval() is dangerous"),
-                (r"new\s+Function\(", "Use of Function constructor is dangerous"),
-                (r"innerHTML\s*=", "Use of innerHTML is dangerous"),
-                (r"document\.write\(", "Use of document.write() is dangerous")
-            ]
-        }
-        
-        patterns = security_patterns.get(language.lower(), [])
-        for pattern, message in patterns:
-            matches = re.findall(pattern, code)
-            if matches:
-                security_issues.append({
-                    "type": "security",
-                    "severity": "high",
-                    "message": message,
-                    "line_numbers": self._find_line_numbers(code, pattern)
-                })
-        
-        return security_issues
+        return self._scan_rules(code, language, _SECURITY_PATTERNS, "security", "high", line_starts, literal_hits)
 
-    def _check_performance(self, code: str, language: str) -> List[Dict[str, Any]]:
+    def _check_performance(self,
+                           code: str,
+                           language: str,
+                           line_starts: Optional[List[int]] = None,
+                           literal_hits: Optional[Dict[str, List[int]]] = None) -> List[Dict[str, Any]]:
         """Check for performance issues."""
-        performance_issues = []
-        
-        # Common performance patterns to check
-        performance_patterns = {
-            "python": [
-                (r"for\s+.*\s+in\s+range\(len\(", "Use enumerate() instead of range(len())"),
-                (r"\+\s*=\s*['\"]\w+['\"]", "Use list comprehension or join() for string concatenation"),
-                (r"\.append\(.*\)\s*for\s+.*\s+in", "Use list comprehension instead of loop with append()")
-            ],
-            "javascript": [
-                (r"for\s*\(\s*var\s+i", "Use let instead of var in for loops"),
-                (r"\.forEach\(\s*function\s*\(", "Use arrow function in forEach"),
-                (r"document\.getElementsBy", "Use querySelector for better performance")
-            ]
-        }
-        
-        patterns = performance_patterns.get(language.lower(), [])
-        for pattern, message in patterns:
-            matches = re.findall(pattern, code)
-            if matches:
-                performance_issues.append({
-                    "type": "performance",
-                    "severity": "medium",
-                    "message": message,
-                    "line_numbers": self._find_line_numbers(code, pattern)
-                })
-        
-        return performance_issues
+        return self._scan_rules(code, language, _PERFORMANCE_PATTERNS, "performance", "medium", line_starts, literal_hits)
 
-    def _check_maintainability(self, code: str, language: str) -> List[Dict[str, Any]]:
+    def _check_maintainability(self,
+                               code: str,
+                               language: str,
+                               line_starts: Optional[List[int]] = None,
+                               literal_hits: Optional[Dict[str, List[int]]] = None) -> List[Dict[str, Any]]:
         """Check for maintainability issues."""
-        maintainability_issues = []
+        return self._scan_rules(code, language, _MAINTAINABILITY_PATTERNS, "maintainability", "medium", line_starts, literal_hits)
+
+    def _scan_rules(self,
+                    code: str,
+                    language: str,
+                    compiled_rules: Dict[str, Tuple[Optional[re.Pattern], List[Tuple[str, str]], Dict[str, str]]],
+                    issue_type: str,
+                    severity: str,
+                    line_starts: Optional[List[int]] = None,
+                    literal_hits: Optional[Dict[str, List[int]]] = None) -> List[Dict[str, Any]]:
+        """
+        Scan code with a rule set's literals and fused regex and report one issue
+        per matching rule. ``literal_hits`` are literal offsets the caller already
+        found via _find_literals; without them the literals are searched here.
+        """
+        issues = []
+        rule_set = compiled_rules.get(language.lower())
+        if rule_set is None:
+            return issues
         
-        # Common maintainability patterns to check
-        maintainability_patterns = {
-            "python": [
-                (r"def\s+\w+\s*\([^)]{120,}\)", "Function signature is too long"),
-                (r"if.*(?:and|or).*(?:and|or)", "Complex conditional statement"),
-                (r"global\s+\w+", "Use of global variables")
-            ],
-            "javascript": [
-                (r"function\s*\([^)]{120,}\)", "Function signature is too long"),
-                (r"if.*&&.*&&", "Complex conditional statement"),
-                (r"var\s+\w+\s*=\s*function", "Use const/let and arrow functions")
-            ]
-        }
+        pattern, literals, messages = rule_set
+        if literal_hits is not None:
+            positions = {tag: list(found) for tag, found in literal_hits.items()}
+        else:
+            positions = {}
+            for tag, literal in literals:
+                found = _find_all(code, literal)
+                if found:
+                    positions[tag] = found
+        if pattern is not None:
+            for match in pattern.finditer(code):
+                positions.setdefault(match.lastgroup, []).append(match.start())
+        
+        if positions and line_starts is None:
+            line_starts = _line_starts(code)
         
-        patterns = maintainability_patterns.get(language.lower(), [])
-        for pattern, message in patterns:
-            matches = re.findall(pattern, code)
-            if matches:
-                maintainability_issues.append({
-                    "type": "maintainability",
-                    "severity": "medium",
+        # Report in rule order so output is stable regardless of match order
+        for tag, message in messages.items():
+            if tag in positions:
+                issues.append({
+                    "type": issue_type,
+                    "severity": severity,
                     "message": message,
-                    "line_numbers": self._find_line_numbers(code, pattern)
+                    "line_numbers": sorted({bisect_right(line_starts, p) for p in positions[tag]})
                 })
         
-        return maintainability_issues
-
-    def _find_line_numbers(self, code: str, pattern: str) -> List[int]:
-        """Find line numbers for a pattern in code."""
-        lines = code.splitlines()
-        line_numbers = []
-        for i, line in enumerate(lines, 1):
-            if re.search(pattern, line):
-                line_numbers.append(i)
-        return line_numbers
+        return issues
 
     def _extract_quality_issues(self, analysis_result: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract code quality issues from analysis result."""
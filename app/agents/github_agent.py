@@ -1,18 +1,37 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 import logging
-from github import Github, Repository, Issue, PullRequest
-from app.core.config import settings
+from github import Repository, Issue, PullRequest, GithubException
+from app.core.config import get_settings
+from app.core.file_patterns import TEST_PATH_PATTERN
+from app.core.github_client import get_github_client, graphql_query
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Commit categories for release notes, matched against the start of the
+# message (conventional-commit style); group names are the changes keys
+_COMMIT_CATEGORY_PATTERN = re.compile(
+    r"^(?:(?P<features>feat(?:ure)?)|(?P<fixes>fix|bug)|(?P<improvements>improve|enhance))",
+    re.IGNORECASE
+)
+
+# Source files test paths are measured against
+_SOURCE_EXTENSIONS = (".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".go", ".rb")
+
+# Top-level file listings, shared across agent instances so repeated
+# Streamlit reruns don't refetch them: repo -> (fetched_at, names)
+CONTENT_CACHE_TTL = 300  # seconds
+_top_level_cache: Dict[str, tuple] = {}
+
 class GitHubAgent:
     def __init__(self):
         """Initialize GitHub agent with authentication."""
-        self.github = Github(settings.GITHUB_TOKEN)
-        self.username = settings.GITHUB_USERNAME
+        self.github = get_github_client()
+        self.username = get_settings().GITHUB_USERNAME
 
     async def analyze_user_repositories(self) -> Dict[str, Any]:
         """Analyze all repositories of the authenticated user."""
@@ -33,8 +52,24 @@ class GitHubAgent:
                     "repositories": []
                 }
                 
-                for repo in repos:
-                    repo_data = await self.analyze_repository(repo.full_name)
+                # Fan out across repositories, bounded to stay under GitHub's
+                # secondary rate limits
+                semaphore = asyncio.Semaphore(get_settings().GITHUB_MAX_CONCURRENCY)
+                
+                async def analyze(repo_name: str) -> Dict[str, Any]:
+                    async with semaphore:
+                        return await self.analyze_repository(repo_name)
+                
+                repo_names = [repo.full_name for repo in repos]
+                repo_results = await asyncio.gather(
+                    *(analyze(repo_name) for repo_name in repo_names),
+                    return_exceptions=True
+                )
+                
+                for repo_name, repo_data in zip(repo_names, repo_results):
+                    if isinstance(repo_data, Exception):
+                        logger.error(f"Error analyzing repository {repo_name}: {str(repo_data)}")
+                        repo_data = {"repository": repo_name, "error": str(repo_data)}
                     results["repositories"].append(repo_data)
                 
                 return results
@@ -69,8 +104,8 @@ class GitHubAgent:
                                 title: str, 
                                 body: str, 
                                 head: str, 
-                                base: str = "main") -> Dict[str, Any]:
-        """Create a new pull request."""
+                                base: Optional[str] = None) -> Dict[str, Any]:
+        """Create a new pull request, against the default branch unless ``base`` is given."""
         try:
             with st.spinner("Creating pull request..."):
                 repo = self.github.get_repo(repo_name)
@@ -78,7 +113,7 @@ class GitHubAgent:
                     title=title,
                     body=body,
                     head=head,
-                    base=base
+                    base=base or repo.default_branch
                 )
                 return {
                     "number": pr.number,
@@ -95,117 +130,165 @@ class GitHubAgent:
         """Analyze issues in a repository."""
         try:
             with st.spinner("Analyzing issues..."):
-                repo = self.github.get_repo(repo_name)
-                issues = repo.get_issues(state="all")
-                
-                results = {
-                    "total_issues": 0,
-                    "open_issues": 0,
-                    "closed_issues": 0,
-                    "issues_by_label": {},
-                    "issues_by_assignee": {},
-                    "recent_issues": [],
-                    "stale_issues": []
-                }
-                
-                for issue in issues:
-                    results["total_issues"] += 1
-                    if issue.state == "open":
-                        results["open_issues"] += 1
-                    else:
-                        results["closed_issues"] += 1
-                    
-                    # Group by labels
-                    for label in issue.labels:
-                        if label.name not in results["issues_by_label"]:
-                            results["issues_by_label"][label.name] = 0
-                        results["issues_by_label"][label.name] += 1
-                    
-                    # Group by assignee
-                    if issue.assignee:
-                        assignee = issue.assignee.login
-                        if assignee not in results["issues_by_assignee"]:
-                            results["issues_by_assignee"][assignee] = 0
-                        results["issues_by_assignee"][assignee] += 1
-                    
-                    # Recent issues
-                    if issue.created_at > datetime.now() - timedelta(days=7):
-                        results["recent_issues"].append({
-                            "number": issue.number,
-                            "title": issue.title,
-                            "state": issue.state,
-                            "created_at": issue.created_at.isoformat()
-                        })
-                    
-                    # Stale issues (no activity for 30 days)
-                    if issue.state == "open" and issue.updated_at < datetime.now() - timedelta(days=30):
-                        results["stale_issues"].append({
-                            "number": issue.number,
-                            "title": issue.title,
-                            "last_updated": issue.updated_at.isoformat()
-                        })
-                
-                return results
+                # PyGithub blocks on HTTP, so collect off the event loop
+                return await asyncio.to_thread(self._collect_issue_stats, repo_name)
         except Exception as e:
             logger.error(f"Error analyzing issues: {str(e)}")
             st.error(f"Error analyzing issues: {str(e)}")
             return {"error": str(e)}
 
+    def _collect_issue_stats(self, repo_name: str) -> Dict[str, Any]:
+        """Collect issue statistics for a repository."""
+        now = datetime.now(timezone.utc)
+        recent_cutoff = now - timedelta(days=7)
+        stale_cutoff = now - timedelta(days=30)
+        query = f"repo:{repo_name} is:issue"
+        
+        # Counters come from the Search API's totalCount, one request each
+        open_issues = self.github.search_issues(f"{query} is:open").totalCount
+        closed_issues = self.github.search_issues(f"{query} is:closed").totalCount
+        
+        results = {
+            "total_issues": open_issues + closed_issues,
+            "open_issues": open_issues,
+            "closed_issues": closed_issues,
+            "issues_by_label": {},
+            "issues_by_assignee": {},
+            "recent_issues": [],
+            "stale_issues": []
+        }
+        
+        # Group by labels and assignee, fetching only those fields 100 at a time
+        nodes = self._iter_graphql_connection(
+            repo_name,
+            "issues",
+            "labels(first: 20) { nodes { name } } assignees(first: 1) { nodes { login } }"
+        )
+        for node in nodes:
+            for label in node["labels"]["nodes"]:
+                label_name = label["name"]
+                results["issues_by_label"][label_name] = results["issues_by_label"].get(label_name, 0) + 1
+            
+            for assignee in node["assignees"]["nodes"]:
+                login = assignee["login"]
+                results["issues_by_assignee"][login] = results["issues_by_assignee"].get(login, 0) + 1
+        
+        # Recent and stale issues come from sorted listings that stop at the
+        # cutoff, which keeps them off the Search API's tighter rate limit
+        repo = self.github.get_repo(repo_name)
+        
+        # Recent issues, newest first
+        for issue in repo.get_issues(state="all", sort="created", direction="desc"):
+            if issue.created_at < recent_cutoff:
+                break
+            # The issues endpoint also lists pull requests
+            if issue.pull_request is not None:
+                continue
+            results["recent_issues"].append({
+                "number": issue.number,
+                "title": issue.title,
+                "state": issue.state,
+                "created_at": issue.created_at.isoformat()
+            })
+        
+        # Stale issues (no activity for 30 days), least recently updated first
+        for issue in repo.get_issues(state="open", sort="updated", direction="asc"):
+            if issue.updated_at >= stale_cutoff:
+                break
+            if issue.pull_request is not None:
+                continue
+            results["stale_issues"].append({
+                "number": issue.number,
+                "title": issue.title,
+                "last_updated": issue.updated_at.isoformat()
+            })
+        
+        return results
+
     async def analyze_pull_requests(self, repo_name: str) -> Dict[str, Any]:
         """Analyze pull requests in a repository."""
         try:
             with st.spinner("Analyzing pull requests..."):
-                repo = self.github.get_repo(repo_name)
-                prs = repo.get_pulls(state="all")
-                
-                results = {
-                    "total_prs": 0,
-                    "open_prs": 0,
-                    "merged_prs": 0,
-                    "closed_prs": 0,
-                    "prs_by_author": {},
-                    "recent_prs": [],
-                    "stale_prs": []
-                }
-                
-                for pr in prs:
-                    results["total_prs"] += 1
-                    if pr.state == "open":
-                        results["open_prs"] += 1
-                    elif pr.merged:
-                        results["merged_prs"] += 1
-                    else:
-                        results["closed_prs"] += 1
-                    
-                    # Group by author
-                    author = pr.user.login
-                    if author not in results["prs_by_author"]:
-                        results["prs_by_author"][author] = 0
-                    results["prs_by_author"][author] += 1
-                    
-                    # Recent PRs
-                    if pr.created_at > datetime.now() - timedelta(days=7):
-                        results["recent_prs"].append({
-                            "number": pr.number,
-                            "title": pr.title,
-                            "state": pr.state,
-                            "created_at": pr.created_at.isoformat()
-                        })
-                    
-                    # Stale PRs (no activity for 7 days)
-                    if pr.state == "open" and pr.updated_at < datetime.now() - timedelta(days=7):
-                        results["stale_prs"].append({
-                            "number": pr.number,
-                            "title": pr.title,
-                            "last_updated": pr.updated_at.isoformat()
-                        })
-                
-                return results
+                # PyGithub blocks on HTTP, so collect off the event loop
+                return await asyncio.to_thread(self._collect_pull_request_stats, repo_name)
         except Exception as e:
             logger.error(f"Error analyzing pull requests: {str(e)}")
             st.error(f"Error analyzing pull requests: {str(e)}")
             return {"error": str(e)}
 
+    def _collect_pull_request_stats(self, repo_name: str) -> Dict[str, Any]:
+        """Collect pull request statistics for a repository."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+        query = f"repo:{repo_name} is:pr"
+        
+        # Counters come from the Search API's totalCount, one request each
+        open_prs = self.github.search_issues(f"{query} is:open").totalCount
+        merged_prs = self.github.search_issues(f"{query} is:merged").totalCount
+        closed_prs = self.github.search_issues(f"{query} is:closed is:unmerged").totalCount
+        
+        results = {
+            "total_prs": open_prs + merged_prs + closed_prs,
+            "open_prs": open_prs,
+            "merged_prs": merged_prs,
+            "closed_prs": closed_prs,
+            "prs_by_author": {},
+            "recent_prs": [],
+            "stale_prs": []
+        }
+        
+        # Group by author, fetching only that field 100 at a time
+        for node in self._iter_graphql_connection(repo_name, "pullRequests", "author { login }"):
+            # Deleted accounts come back without an author
+            author = (node["author"] or {}).get("login", "ghost")
+            results["prs_by_author"][author] = results["prs_by_author"].get(author, 0) + 1
+        
+        # Recent and stale PRs come from sorted listings that stop at the cutoff
+        repo = self.github.get_repo(repo_name)
+        
+        # Recent PRs, newest first
+        for pr in repo.get_pulls(state="all", sort="created", direction="desc"):
+            if pr.created_at < cutoff:
+                break
+            results["recent_prs"].append({
+                "number": pr.number,
+                "title": pr.title,
+                "state": pr.state,
+                "created_at": pr.created_at.isoformat()
+            })
+        
+        # Stale PRs (no activity for 7 days), least recently updated first
+        for pr in repo.get_pulls(state="open", sort="updated", direction="asc"):
+            if pr.updated_at >= cutoff:
+                break
+            results["stale_prs"].append({
+                "number": pr.number,
+                "title": pr.title,
+                "last_updated": pr.updated_at.isoformat()
+            })
+        
+        return results
+
+    def _iter_graphql_connection(self, repo_name: str, connection: str, fields: str) -> Iterator[Dict[str, Any]]:
+        """Yield every node of a repository connection, 100 nodes per request."""
+        owner, name = repo_name.split("/", 1)
+        query = f"""query($owner: String!, $name: String!, $cursor: String) {{
+            repository(owner: $owner, name: $name) {{
+                {connection}(first: 100, after: $cursor) {{
+                    pageInfo {{ hasNextPage endCursor }}
+                    nodes {{ {fields} }}
+                }}
+            }}
+        }}"""
+        
+        cursor = None
+        while True:
+            data = graphql_query(query, {"owner": owner, "name": name, "cursor": cursor})
+            page = data["repository"][connection]
+            yield from page["nodes"]
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            cursor = page["pageInfo"]["endCursor"]
+
     async def suggest_improvements(self, repo_name: str) -> Dict[str, Any]:
         """Suggest improvements for a repository."""
         try:
@@ -220,41 +303,37 @@ class GitHubAgent:
                     "maintenance": []
                 }
                 
+                # One tree listing answers every existence check below
+                names = self._top_level_names(repo)
+                
                 # Check documentation
-                try:
-                    repo.get_contents("README.md")
-                except:
+                if "README.md" not in names:
                     suggestions["documentation"].append("Add a README.md file")
                 
-                try:
-                    repo.get_contents("CONTRIBUTING.md")
-                except:
+                if "CONTRIBUTING.md" not in names:
                     suggestions["documentation"].append("Add CONTRIBUTING.md guidelines")
                 
-                # Check testing
-                test_files = [f for f in repo.get_contents("") if "test" in f.name.lower()]
-                if not test_files:
+                # Check testing against the share of source files that are tests
+                test_file_ratio = self._test_file_ratio(repo)
+                if test_file_ratio == 0:
                     suggestions["testing"].append("Add test files")
                 
                 # Check security
-                try:
-                    repo.get_contents("SECURITY.md")
-                except:
+                if "SECURITY.md" not in names:
                     suggestions["security"].append("Add SECURITY.md policy")
                 
                 # Check dependencies
-                try:
-                    repo.get_contents("requirements.txt")
-                except:
+                if "requirements.txt" not in names:
                     suggestions["maintenance"].append("Add requirements.txt")
                 
-                # Check for stale issues
-                issues = await self.analyze_issues(repo_name)
+                # Check for stale issues and PRs concurrently
+                issues, prs = await asyncio.gather(
+                    self.analyze_issues(repo_name),
+                    self.analyze_pull_requests(repo_name)
+                )
                 if issues.get("stale_issues"):
                     suggestions["maintenance"].append("Address stale issues")
                 
-                # Check for stale PRs
-                prs = await self.analyze_pull_requests(repo_name)
                 if prs.get("stale_prs"):
                     suggestions["maintenance"].append("Address stale pull requests")
                 
@@ -264,20 +343,49 @@ class GitHubAgent:
             st.error(f"Error generating suggestions: {str(e)}")
             return {"error": str(e)}
 
+    def _top_level_names(self, repo: Repository.Repository) -> frozenset:
+        """List the top-level paths of a repository, caching the listing for a few minutes."""
+        cached = _top_level_cache.get(repo.full_name)
+        if cached and time.monotonic() - cached[0] < CONTENT_CACHE_TTL:
+            return cached[1]
+        
+        tree = repo.get_git_tree(repo.default_branch, recursive=False)
+        names = frozenset(entry.path for entry in tree.tree)
+        _top_level_cache[repo.full_name] = (time.monotonic(), names)
+        return names
+
+    def _test_file_ratio(self, repo: Repository.Repository) -> float:
+        """Return the fraction of source files in a repository that are tests."""
+        tree = repo.get_git_tree(repo.default_branch, recursive=True)
+        source_files = 0
+        test_files = 0
+        for entry in tree.tree:
+            if entry.type != "blob" or not entry.path.endswith(_SOURCE_EXTENSIONS):
+                continue
+            source_files += 1
+            if TEST_PATH_PATTERN.search(entry.path):
+                test_files += 1
+        return test_files / source_files if source_files else 0.0
+
     async def generate_release_notes(self, repo_name: str, tag: str) -> Dict[str, Any]:
         """Generate release notes for a repository."""
         try:
             with st.spinner("Generating release notes..."):
                 repo = self.github.get_repo(repo_name)
                 
-                # Get commits since last release
+                # Get commits since last release. The Compare API reports the
+                # full count but lists at most 250 commits, so larger releases
+                # page through the branch history instead.
+                total_commits = None
                 try:
                     last_release = repo.get_latest_release()
-                    since = last_release.created_at
-                except:
-                    since = repo.created_at
-                
-                commits = repo.get_commits(since=since)
+                    comparison = repo.compare(last_release.tag_name, repo.default_branch)
+                    total_commits = comparison.total_commits
+                    commits = comparison.commits
+                    if total_commits > len(commits):
+                        commits = repo.get_commits(sha=repo.default_branch, since=last_release.created_at)
+                except GithubException:
+                    commits = repo.get_commits()
                 
                 # Categorize changes
                 changes = {
@@ -287,21 +395,17 @@ class GitHubAgent:
                     "other": []
                 }
                 
+                listed_commits = 0
                 for commit in commits:
-                    message = commit.commit.message.lower()
-                    if "feat" in message or "feature" in message:
-                        changes["features"].append(commit.commit.message)
-                    elif "fix" in message or "bug" in message:
-                        changes["fixes"].append(commit.commit.message)
-                    elif "improve" in message or "enhance" in message:
-                        changes["improvements"].append(commit.commit.message)
-                    else:
-                        changes["other"].append(commit.commit.message)
+                    listed_commits += 1
+                    message = commit.commit.message
+                    match = _COMMIT_CATEGORY_PATTERN.match(message)
+                    changes[match.lastgroup if match else "other"].append(message)
                 
                 return {
                     "tag": tag,
                     "changes": changes,
-                    "total_commits": commits.totalCount
+                    "total_commits": total_commits if total_commits is not None else listed_commits
                 }
         except Exception as e:
             logger.error(f"Error generating release notes: {str(e)}")
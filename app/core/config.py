@@ -1,66 +1,51 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import List
+from functools import lru_cache
+from .env import get_env
 
 class Settings(BaseSettings):
     # Project Settings
     PROJECT_NAME: str = "AI-Powered GitHub Auto-Manager"
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
+    CORS_ORIGINS: List[str] = ["http://localhost:8501"]  # JSON list when set via env
     
     # OpenAI Configuration
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_API_KEY: str = get_env("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = "gpt-4o-mini"
+    LLM_MAX_CONCURRENCY: int = 8  # concurrent model requests per batch
+    
+    # CrewAI Agent Settings
+    CREWAI_MODEL: str = "gpt-4o-mini"
+    CREWAI_TEMPERATURE: float = 0.7
+    CREWAI_MAX_TOKENS: int = 2000
     
     # GitHub Configuration
-    GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
-    GITHUB_USERNAME: str = os.getenv("GITHUB_USERNAME", "")
+    GITHUB_TOKEN: str = get_env("GITHUB_TOKEN", "")
+    GITHUB_TOKENS: List[str] = []  # extra read tokens rotated for analyses (JSON list via env)
+    GITHUB_USERNAME: str = get_env("GITHUB_USERNAME", "")
     GITHUB_DEFAULT_BRANCH: str = "main"
     GITHUB_ANALYSIS_TIMEOUT: int = 300  # seconds
+    GITHUB_MAX_CONCURRENCY: int = 8  # concurrent repository analyses
+    GITHUB_POOL_SIZE: int = 32  # pooled HTTP connections to the GitHub API
+    GITHUB_PER_PAGE: int = 100  # items per page for paginated listings
     
     # Web Automation Settings
     PLAYWRIGHT_BROWSER: str = "chromium"
     PLAYWRIGHT_TIMEOUT: int = 30000
     
-    # Model Management Settings
-    DEFAULT_MODEL_CONFIG: dict = {
-        "code_analysis": {
-            "model_type": "gpt-4o-mini",
-            "temperature": 0.7,
-            "max_tokens": 2000,
-            "context_window": 8000
-        },
-        "bug_detection": {
-            "model_type": "gpt-4o-mini",
-            "temperature": 0.3,
-            "max_tokens": 1000,
-            "context_window": 4000
-        },
-        "code_refactoring": {
-            "model_type": "gpt-4o-mini",
-            "temperature": 0.5,
-            "max_tokens": 1500,
-            "context_window": 6000
-        },
-        "issue_analysis": {
-            "model_type": "gpt-4o-mini",
-            "temperature": 0.7,
-            "max_tokens": 1000,
-            "context_window": 4000
-        },
-        "pr_review": {
-            "model_type": "gpt-4o-mini",
-            "temperature": 0.5,
-            "max_tokens": 1500,
-            "context_window": 6000
-        }
-    }
-    
     class Config:
         case_sensitive = True
         env_file = ".env"
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the application settings on first use and reuse them afterwards."""
+    return Settings()
+
+def __getattr__(name):
+    # Keep ``from app.core.config import settings`` working without building
+    # Settings at import time
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
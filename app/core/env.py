@@ -0,0 +1,12 @@
+import os
+from typing import Optional
+from dotenv import load_dotenv
+
+# Load .env into the process environment once; later imports are served from
+# sys.modules, so no entry point re-reads the file. Variables already set in
+# the process take precedence over .env.
+load_dotenv()
+
+def get_env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Look up an environment variable after .env has been loaded."""
+    return os.environ.get(key, default)
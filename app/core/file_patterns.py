@@ -0,0 +1,12 @@
+"""
+Path patterns shared by the repository analyzers
+"""
+import re
+
+# Test files: anything under a test(s)/spec(s)/__tests__ directory, test_*/spec_*
+# files and *_test.*/*_spec.*/*.test.*/*.spec.* files, at any depth. The
+# analyzer lists matches and the agent's coverage ratio counts them, so both
+# must classify a path the same way.
+TEST_PATH_PATTERN = re.compile(
+    r"(?:^|/)(?:__tests__|tests?|specs?)/|(?:^|/)(?:test|spec)_[^/]*$|[_.](?:test|spec)\.[^/]*$"
+)
@@ -0,0 +1,155 @@
+from typing import Dict, Any, List, Optional
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from github import Github, GithubRetry, Auth
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.github.com"
+GRAPHQL_URL = f"{API_URL}/graphql"
+# Raw file contents; served outside the REST API rate limit
+RAW_URL = "https://raw.githubusercontent.com"
+
+# Gateway errors and 429s are transient. GithubRetry adds 403 itself and
+# retries it only when it is a rate limit.
+_RETRY_STATUSES = [429, 502, 503, 504]
+
+# A token whose last reported remaining quota is below this is skipped while
+# another token still has headroom
+RATE_LIMIT_FLOOR = 100
+
+_client: Optional[Github] = None
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _build_retry() -> GithubRetry:
+    """
+    Retry policy shared by the REST client and the GraphQL/raw session.
+    
+    Backs off exponentially, honors Retry-After, waits out primary rate limits
+    until X-RateLimit-Reset and pauses on secondary rate limits.
+    """
+    return GithubRetry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=_RETRY_STATUSES,
+        respect_retry_after_header=True
+    )
+
+
+class _TokenRotation(requests.auth.AuthBase):
+    """
+    Authenticate each request with the next token in a round-robin pool.
+    
+    Remaining quota is tracked per token from X-RateLimit-Remaining, so
+    tokens that are nearly exhausted are skipped until they are the best
+    option left. REST and GraphQL quotas share one counter per token, which
+    errs on the side of skipping.
+    """
+
+    def __init__(self, tokens: List[str]):
+        self._tokens = tokens
+        self._remaining: Dict[str, Optional[int]] = dict.fromkeys(tokens)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _pick(self) -> str:
+        with self._lock:
+            for _ in range(len(self._tokens)):
+                token = self._tokens[self._next]
+                self._next = (self._next + 1) % len(self._tokens)
+                remaining = self._remaining[token]
+                if remaining is None or remaining >= RATE_LIMIT_FLOOR:
+                    return token
+            return max(self._tokens, key=lambda t: self._remaining[t] or 0)
+
+    def _record(self, token: str, response: requests.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            with self._lock:
+                self._remaining[token] = int(remaining)
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        token = self._pick()
+        request.headers["Authorization"] = f"bearer {token}"
+        request.register_hook("response", lambda response, **kwargs: self._record(token, response))
+        return request
+
+
+def _analysis_tokens() -> List[str]:
+    """Tokens for read-only analysis traffic: the configured pool, else the main token."""
+    settings = get_settings()
+    tokens = list(dict.fromkeys(settings.GITHUB_TOKENS))
+    if not tokens and settings.GITHUB_TOKEN:
+        tokens = [settings.GITHUB_TOKEN]
+    return tokens
+
+
+def get_github_client() -> Github:
+    """Return the process-wide GitHub client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                settings = get_settings()
+                _client = Github(
+                    auth=Auth.Token(settings.GITHUB_TOKEN) if settings.GITHUB_TOKEN else None,
+                    retry=_build_retry(),
+                    pool_size=settings.GITHUB_POOL_SIZE,
+                    per_page=settings.GITHUB_PER_PAGE
+                )
+    return _client
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the pooled HTTP session used for direct GitHub API calls.
+    
+    Requests rotate across GITHUB_TOKENS when several are configured. The
+    PyGithub client keeps the single GITHUB_TOKEN, since its calls act as
+    the authenticated user.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                settings = get_settings()
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.GITHUB_POOL_SIZE,
+                    pool_maxsize=settings.GITHUB_POOL_SIZE,
+                    max_retries=_build_retry()
+                )
+                session.mount("https://", adapter)
+                tokens = _analysis_tokens()
+                if tokens:
+                    session.auth = _TokenRotation(tokens)
+                _session = session
+    return _session
+
+
+def graphql_query(query: str, variables: Dict[str, Any], allow_partial: bool = False) -> Dict[str, Any]:
+    """
+    Run a GraphQL query against the GitHub API and return its data.
+    
+    With allow_partial, field-level errors (e.g. a field the token may not
+    read) are logged and the remaining data is returned instead of raising.
+    """
+    response = get_http_session().post(
+        GRAPHQL_URL,
+        json={"query": query, "variables": variables},
+        timeout=30
+    )
+    response.raise_for_status()
+    payload = response.json()
+    errors = payload.get("errors")
+    if errors:
+        if not (allow_partial and payload.get("data")):
+            raise RuntimeError(errors[0].get("message", "GraphQL query failed"))
+        for error in errors:
+            logger.warning(f"Partial GraphQL result: {error.get('message')}")
+    return payload["data"]
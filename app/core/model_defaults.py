@@ -0,0 +1,39 @@
+"""
+Default model configuration for each task type
+"""
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# Read-only so callers copy before customising; ModelManager takes a copy per instance
+MODEL_DEFAULTS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "code_analysis": MappingProxyType({
+        "model": "gpt-4o-mini",
+        "temperature": 0.7,
+        "max_tokens": 4000,
+        "context_window": 8192
+    }),
+    "bug_detection": MappingProxyType({
+        "model": "gpt-4o-mini",
+        "temperature": 0.3,
+        "max_tokens": 2000,
+        "context_window": 8192
+    }),
+    "commit_message": MappingProxyType({
+        "model": "gpt-4o-mini",
+        "temperature": 0.7,
+        "max_tokens": 500,
+        "context_window": 4096
+    }),
+    "code_refactoring": MappingProxyType({
+        "model": "gpt-4o-mini",
+        "temperature": 0.5,
+        "max_tokens": 3000,
+        "context_window": 8192
+    }),
+    "documentation": MappingProxyType({
+        "model": "gpt-4o-mini",
+        "temperature": 0.7,
+        "max_tokens": 2000,
+        "context_window": 8192
+    })
+})
@@ -1,48 +1,86 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Final, Tuple
+import inspect
 import logging
-from app.core.config import settings
-import streamlit as st
+from string import Formatter
+from collections import defaultdict
+from cachetools import TTLCache
+from app.core.model_defaults import MODEL_DEFAULTS
 
 logger = logging.getLogger(__name__)
 
+# Task contexts are kept for an hour and capped so a long-lived process
+# doesn't accumulate them without bound
+CONTEXT_CACHE_SIZE = 256
+CONTEXT_TTL = 3600  # seconds
+
+# Prompt templates per task type, as written
+_PROMPT_SOURCES = {
+    "code_analysis": """Analyze the following code for:
+    1. Code quality and best practices
+    2. Potential bugs and issues
+    3. Performance optimizations
+    4. Security vulnerabilities
+    5. Documentation needs
+    
+    Code:
+    {code}
+    
+    Provide a detailed analysis with specific recommendations.""",
+    
+    "bug_detection": """Detect potential bugs in the following code:
+    1. Runtime errors
+    2. Logic errors
+    3. Security vulnerabilities
+    4. Performance issues
+    5. Edge cases
+    
+    Code:
+    {code}
+    
+    List all potential issues with explanations and suggested fixes.""",
+    
+    "commit_message": """Generate a clear and descriptive commit message for the following changes:
+    
+    Changes:
+    {changes}
+    
+    Follow conventional commit format and include relevant details.""",
+    
+    "code_refactoring": """Suggest refactoring improvements for the following code:
+    1. Code organization
+    2. Design patterns
+    3. Performance optimizations
+    4. Readability improvements
+    5. Maintainability enhancements
+    
+    Code:
+    {code}
+    
+    Provide specific refactoring suggestions with code examples."""
+}
+
+# Built once at import with the source indentation stripped, so the model
+# isn't sent a block of leading whitespace on every line
+_PROMPTS: Final[Dict[str, str]] = {
+    task_type: inspect.cleandoc(template) for task_type, template in _PROMPT_SOURCES.items()
+}
+
+def _split_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Split a format template into (literal text, placeholder name) pairs."""
+    return tuple((literal, field) for literal, field, _, _ in Formatter().parse(template))
+
+# Templates pre-split at import so rendering is plain concatenation
+_PROMPT_PARTS: Final[Dict[str, Tuple[Tuple[str, Optional[str]], ...]]] = {
+    task_type: _split_template(template) for task_type, template in _PROMPTS.items()
+}
+
 class ModelManager:
     def __init__(self):
         """Initialize the ModelManager with default model configurations."""
-        self.models = {
-            "code_analysis": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.7,
-                "max_tokens": 4000,
-                "context_window": 8192
-            },
-            "bug_detection": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.3,
-                "max_tokens": 2000,
-                "context_window": 8192
-            },
-            "commit_message": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.7,
-                "max_tokens": 500,
-                "context_window": 4096
-            },
-            "code_refactoring": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.5,
-                "max_tokens": 3000,
-                "context_window": 8192
-            },
-            "documentation": {
-                "model": "gpt-4o-mini",
-                "temperature": 0.7,
-                "max_tokens": 2000,
-                "context_window": 8192
-            }
-        }
+        self.models = {task: dict(config) for task, config in MODEL_DEFAULTS.items()}
         
-        self.contexts = {}
-        self.model_usage = {}
+        self.contexts = TTLCache(maxsize=CONTEXT_CACHE_SIZE, ttl=CONTEXT_TTL)
+        self.model_usage = defaultdict(lambda: {"total_tokens": 0, "requests": 0})
 
     def get_model_config(self, task_type: str) -> Dict[str, Any]:
         """
@@ -54,15 +92,7 @@ class ModelManager:
         Returns:
             Dictionary containing model configuration
         """
-        try:
-            if task_type not in self.models:
-                st.warning(f"Task type {task_type} not found. Using default configuration.")
-                return self.models["code_analysis"]
-            return self.models[task_type]
-        except Exception as e:
-            logger.error(f"Error getting model config: {str(e)}")
-            st.error(f"Error getting model configuration: {str(e)}")
-            return self.models["code_analysis"]
+        return self.models.get(task_type, self.models["code_analysis"])
 
     def update_model_config(self, task_type: str, config: Dict[str, Any]) -> bool:
         """
@@ -75,14 +105,11 @@ class ModelManager:
         Returns:
             Boolean indicating success
         """
-        try:
-            if task_type in self.models:
-                self.models[task_type].update(config)
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Error updating model config: {str(e)}")
+        model_config = self.models.get(task_type)
+        if model_config is None:
             return False
+        model_config.update(config)
+        return True
 
     def get_context(self, task_type: str) -> Optional[Dict[str, Any]]:
         """
@@ -107,39 +134,30 @@ class ModelManager:
         Returns:
             Boolean indicating success
         """
-        try:
-            self.contexts[task_type] = context
-            return True
-        except Exception as e:
-            logger.error(f"Error updating context: {str(e)}")
-            return False
+        self.contexts[task_type] = context
+        return True
 
-    def track_usage(self, task_type: str, tokens_used: int) -> None:
+    def record_usage(self, task_type: str, tokens_used: int) -> None:
         """
-        Track model usage statistics.
+        Record model usage statistics. Only updates counters; the Streamlit
+        sidebar renders them separately so this stays cheap on the hot path.
         
         Args:
             task_type: Type of task
             tokens_used: Number of tokens used
         """
-        try:
-            if task_type not in self.model_usage:
-                self.model_usage[task_type] = {
-                    "total_tokens": 0,
-                    "requests": 0
-                }
-            
-            self.model_usage[task_type]["total_tokens"] += tokens_used
-            self.model_usage[task_type]["requests"] += 1
-            
-            # Show usage in Streamlit
-            st.sidebar.markdown(f"### Model Usage for {task_type}")
-            st.sidebar.markdown(f"Total Tokens: {self.model_usage[task_type]['total_tokens']}")
-            st.sidebar.markdown(f"Requests: {self.model_usage[task_type]['requests']}")
-            
-        except Exception as e:
-            logger.error(f"Error tracking model usage: {str(e)}")
-            st.error(f"Error tracking model usage: {str(e)}")
+        usage = self.model_usage[task_type]
+        usage["total_tokens"] += tokens_used
+        usage["requests"] += 1
+
+    # Kept for existing callers
+    track_usage = record_usage
+
+    def reset_usage_stats(self) -> None:
+        """Zero the usage counters of every task seen so far."""
+        for usage in self.model_usage.values():
+            usage["total_tokens"] = 0
+            usage["requests"] = 0
 
     def get_usage_stats(self) -> Dict[str, Any]:
         """
@@ -148,7 +166,7 @@ class ModelManager:
         Returns:
             Dictionary containing usage statistics
         """
-        return self.model_usage
+        return dict(self.model_usage)
 
     def optimize_model_selection(self, task_type: str, input_size: int) -> Dict[str, Any]:
         """
@@ -183,49 +201,21 @@ class ModelManager:
         Returns:
             String containing the prompt template
         """
-        prompts = {
-            "code_analysis": """Analyze the following code for:
-            1. Code quality and best practices
-            2. Potential bugs and issues
-            3. Performance optimizations
-            4. Security vulnerabilities
-            5. Documentation needs
-            
-            Code:
-            {code}
-            
-            Provide a detailed analysis with specific recommendations.""",
-            
-            "bug_detection": """Detect potential bugs in the following code:
-            1. Runtime errors
-            2. Logic errors
-            3. Security vulnerabilities
-            4. Performance issues
-            5. Edge cases
-            
-            Code:
-            {code}
-            
-            List all potential issues with explanations and suggested fixes.""",
-            
-            "commit_message": """Generate a clear and descriptive commit message for the following changes:
-            
-            Changes:
-            {changes}
-            
-            Follow conventional commit format and include relevant details.""",
-            
-            "code_refactoring": """Suggest refactoring improvements for the following code:
-            1. Code organization
-            2. Design patterns
-            3. Performance optimizations
-            4. Readability improvements
-            5. Maintainability enhancements
-            
-            Code:
-            {code}
-            
-            Provide specific refactoring suggestions with code examples."""
-        }
+        return _PROMPTS.get(task_type, _PROMPTS["code_analysis"])
+
+    def render_prompt(self, task_type: str, **values: Any) -> str:
+        """
+        Fill in the prompt template for a task type.
         
-        return prompts.get(task_type, prompts["code_analysis"]) 
\ No newline at end of file
+        Args:
+            task_type: The type of task
+            **values: Placeholder values, e.g. code="..."
+            
+        Returns:
+            The rendered prompt
+        """
+        parts = _PROMPT_PARTS.get(task_type, _PROMPT_PARTS["code_analysis"])
+        return "".join(
+            literal + (str(values[field]) if field is not None else "")
+            for literal, field in parts
+        )
@@ -1,50 +1,67 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
+from fastapi.responses import ORJSONResponse
+import app.core.env  # loads .env once for the process
+from app.core.config import get_settings
 from app.agents.code_review_agent import CodeReviewAgent
-from app.utils.web_automation import WebAutomation
+from app.utils.web_automation import submit_web_tests
 from app.core.model_manager import ModelManager
 from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared components at startup, off the event loop."""
+    # One manager, so /model-stats reports the usage the agent records
+    app.state.model_manager = await asyncio.to_thread(ModelManager)
+    app.state.code_review_agent = await asyncio.to_thread(CodeReviewAgent, app.state.model_manager)
+    yield
+
+def get_code_review_agent(request: Request) -> CodeReviewAgent:
+    return request.app.state.code_review_agent
+
+def get_model_manager(request: Request) -> ModelManager:
+    return request.app.state.model_manager
+
 app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    title=get_settings().PROJECT_NAME,
+    version=get_settings().VERSION,
+    openapi_url=f"{get_settings().API_V1_STR}/openapi.json"
 )
 
-# Configure CORS
+# Configure CORS; browsers may cache preflight results for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=get_settings().CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
+    max_age=86400,
 )
 
-# Initialize components
-code_review_agent = CodeReviewAgent()
-web_automation = WebAutomation()
-model_manager = ModelManager()
-
 @app.get("/")
 async def root():
     """Root endpoint returning basic information about the service."""
     return {
-        "name": settings.PROJECT_NAME,
-        "version": settings.VERSION,
+        "name": get_settings().PROJECT_NAME,
+        "version": get_settings().VERSION,
         "status": "operational"
     }
 
-@app.post("/api/v1/analyze-code")
+@app.post("/api/v1/analyze-code", response_model=None)
 async def analyze_code(
     code: str,
     language: str,
-    context: Optional[Dict[str, Any]] = None
+    context: Optional[Dict[str, Any]] = None,
+    code_review_agent: CodeReviewAgent = Depends(get_code_review_agent)
 ) -> Dict[str, Any]:
     """
     Analyze code using the CodeReviewAgent.
@@ -64,7 +81,7 @@ async def analyze_code(
         logger.error(f"Error analyzing code: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/v1/analyze-web")
+@app.post("/api/v1/analyze-web", response_model=None)
 async def analyze_web(
     url: str,
     test_scenarios: Optional[Dict[str, Any]] = None
@@ -80,14 +97,15 @@ async def analyze_web(
         Analysis results including accessibility, performance, and security metrics
     """
     try:
-        results = web_automation.run_automated_tests(url, test_scenarios)
+        # Runs on the shared browser's thread without blocking the event loop
+        results = await asyncio.wrap_future(submit_web_tests(url, test_scenarios))
         return results
     except Exception as e:
         logger.error(f"Error analyzing website: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/v1/model-stats")
-async def get_model_stats() -> Dict[str, Any]:
+@app.get("/api/v1/model-stats", response_model=None)
+async def get_model_stats(model_manager: ModelManager = Depends(get_model_manager)) -> Dict[str, Any]:
     """
     Get model usage statistics.
     
@@ -101,8 +119,11 @@ async def get_model_stats() -> Dict[str, Any]:
         logger.error(f"Error getting model stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/v1/model-config/{task_type}")
-async def get_model_config(task_type: str) -> Dict[str, Any]:
+@app.get("/api/v1/model-config/{task_type}", response_model=None)
+async def get_model_config(
+    task_type: str,
+    model_manager: ModelManager = Depends(get_model_manager)
+) -> Dict[str, Any]:
     """
     Get model configuration for a specific task type.
     
@@ -122,5 +143,17 @@ async def get_model_config(task_type: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Workers re-import the app, so it is passed by import string. "auto" picks
+    # uvloop and httptools when installed (see requirements.txt) and falls back
+    # to asyncio/h11 where they aren't available, e.g. uvloop on Windows.
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=max(2, (os.cpu_count() or 2) // 2),
+        log_level="info"
+    ) 
\ No newline at end of file
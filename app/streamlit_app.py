@@ -11,33 +11,318 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import required modules
+from app.core.env import get_env
 from app.utils.github_analyzer import GitHubAnalyzer
-from app.utils.web_automation import WebAutomation
+from app.utils.web_automation import submit_web_tests
 from app.agents.code_review_agent import CodeReviewAgent
 from app.utils.redis_manager import RedisManager
 from app.core.model_manager import ModelManager
-from dotenv import load_dotenv
-import json
+import asyncio
+import hashlib
+import queue
+from concurrent.futures import wait
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+from urllib.parse import urlsplit, urlunsplit
 from datetime import datetime
 
-# Load environment variables
-load_dotenv()
+def run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is installed."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+def run_web_tests(url: str, status):
+    """Run web tests on the shared browser, relaying its progress messages into a st.status.
+    
+    The callback fires on the browser thread, where Streamlit elements can't be
+    written, so messages are queued and drained here on the script thread.
+    """
+    updates = queue.SimpleQueue()
+    future = submit_web_tests(url, progress_cb=updates.put)
+    while True:
+        done, _ = wait([future], timeout=0.1)
+        while not updates.empty():
+            status.write(updates.get())
+        if done:
+            return future.result()
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    """Render an epoch-nanosecond timestamp as local ISO 8601."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+def render_web_results(results: dict) -> None:
+    """Show web test results; the run timestamp stays in epoch nanoseconds until here."""
+    timestamp = results.get("timestamp")
+    # Entries cached before results carried epoch ints hold an ISO string already
+    if isinstance(timestamp, int):
+        results = {**results, "timestamp": format_timestamp_ns(timestamp)}
+    st.json(results)
+
+def code_cache_key(code: str) -> str:
+    """Stable cache key for a code snippet, identical across processes."""
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).hexdigest()
+
+def normalize_web_url(url: str) -> str:
+    """Lowercase the scheme and host of a URL for cache keys; paths stay case-sensitive."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+
+# Long-lived components are built once per process and shared across reruns
+@st.cache_resource
+def get_redis_manager() -> RedisManager:
+    return RedisManager()
+
+@st.cache_resource
+def get_github_analyzer() -> GitHubAnalyzer:
+    return GitHubAnalyzer(get_redis_manager())
+
+# The reviewer records usage on the manager the sidebar and Model Management tab read
+@st.cache_resource
+def get_code_reviewer() -> CodeReviewAgent:
+    return CodeReviewAgent(get_model_manager())
+
+@st.cache_resource
+def get_model_manager() -> ModelManager:
+    return ModelManager()
+
+def render_repo_analysis(results: dict) -> None:
+    """Render a repository analysis; shared by the fresh and cached paths."""
+    st.subheader("Repository Information")
+    repo_info = results.get("repository", {})
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Stars", repo_info.get("stars", 0))
+        st.metric("Forks", repo_info.get("forks", 0))
+    with col2:
+        st.metric("Open Issues", repo_info.get("issues", 0))
+        st.metric("Language", repo_info.get("language", "Unknown"))
+    with col3:
+        st.metric("Created", repo_info.get("created_at", "Unknown"))
+        st.metric("Last Updated", repo_info.get("updated_at", "Unknown"))
+    
+    # Display code analysis
+    st.subheader("Code Analysis")
+    code_analysis = results.get("code_analysis", {})
+    st.metric("Total Files", code_analysis.get("total_files", 0))
+    st.metric("Total Lines", code_analysis.get("total_lines", 0))
+    
+    # Long listings go in expanders so they stay collapsed until asked for
+    issues = code_analysis.get("issues")
+    if issues:
+        with st.expander(f"Issues Found ({len(issues)})"):
+            for issue in issues:
+                st.warning(f"{issue['type'].title()} Issue: {issue['message']}")
+    
+    # Display security analysis
+    st.subheader("Security Analysis")
+    security = results.get("security_analysis", {})
+    if security.get("vulnerabilities"):
+        st.error("Security Vulnerabilities Found!")
+        for vuln in security["vulnerabilities"]:
+            st.error(f"Vulnerability: {vuln}")
+    
+    # Display dependency analysis
+    st.subheader("Dependency Analysis")
+    deps = results.get("dependency_analysis", {})
+    if deps.get("dependencies"):
+        with st.expander("Dependencies"):
+            for file, packages in deps["dependencies"].items():
+                st.write(f"**{file}:**")
+                for pkg, version in packages.items():
+                    st.write(f"- {pkg}: {version}")
+    
+    # Display test coverage
+    st.subheader("Test Coverage")
+    tests = results.get("test_coverage", {})
+    if tests.get("test_files"):
+        with st.expander(f"Test Files Found ({len(tests['test_files'])})"):
+            for file in tests["test_files"]:
+                st.write(f"- {file}")
+    
+    # Display documentation
+    st.subheader("Documentation")
+    docs = results.get("documentation", {})
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("README", "✅" if docs.get("has_readme") else "❌")
+    with col2:
+        st.metric("Contributing", "✅" if docs.get("has_contributing") else "❌")
+    with col3:
+        st.metric("License", "✅" if docs.get("has_license") else "❌")
+
+@st.fragment
+def render_usage_sidebar(model_manager: ModelManager):
+    """Show model usage in the sidebar; reruns on its own, not per tracked call."""
+    for task_type, usage in model_manager.get_usage_stats().items():
+        st.markdown(f"### Model Usage for {task_type}")
+        st.markdown(f"Total Tokens: {usage['total_tokens']}")
+        st.markdown(f"Requests: {usage['requests']}")
+
+@st.fragment
+def github_tab(redis_manager: RedisManager, github_analyzer: GitHubAnalyzer, user_id: str, user_session: dict):
+    """GitHub Analysis tab; reruns on its own when its widgets change."""
+    st.header("GitHub Repository Analysis")
+    repo_url = st.text_input(
+        "Enter GitHub Repository URL:",
+        value=user_session["last_repo"] or "",
+        placeholder="https://github.com/username/repo"
+    )
+    if st.button("Analyze Repository"):
+        if repo_url:
+            with st.spinner("Analyzing repository..."):
+                # The analyzer serves unchanged repositories from Redis
+                analysis_results = run_async(github_analyzer.analyze_repository(repo_url))
+                redis_manager.store_last_repo(user_id, repo_url)
+                user_session["last_repo"] = repo_url
+                
+                render_repo_analysis(analysis_results)
+        else:
+            st.warning("Please enter a GitHub repository URL.")
+
+@st.fragment
+def code_review_tab(redis_manager: RedisManager, code_reviewer: CodeReviewAgent):
+    """Code Review tab."""
+    st.header("Code Review")
+    code_input = st.text_area("Enter code to analyze:", height=200)
+    language = st.selectbox("Language", ["python", "javascript"])
+    if st.button("Analyze Code"):
+        if code_input:
+            with st.spinner("Analyzing code..."):
+                # Check if analysis exists in Redis
+                code_id = code_cache_key(f"{language}:{code_input}")
+                cached_analysis = redis_manager.get_code_analysis_raw(code_id)
+                
+                if cached_analysis:
+                    st.info("Using cached analysis")
+                    st.code(cached_analysis, language="json")
+                else:
+                    # Perform new analysis
+                    analysis_results = run_async(code_reviewer.analyze_code(code_input, language))
+                    
+                    # Store in Redis
+                    redis_manager.store_code_analysis(code_id, analysis_results)
+                    
+                    # The analysis recorded model usage; rerun the whole app so the
+                    # usage sidebar and Model Management tab show it, carrying the
+                    # results over to be displayed on that run
+                    st.session_state.code_review_results = analysis_results
+                    st.rerun()
+        else:
+            st.warning("Please enter some code to analyze.")
+    elif "code_review_results" in st.session_state:
+        # Display results
+        st.json(st.session_state.pop("code_review_results"))
+
+@st.fragment
+def web_automation_tab(redis_manager: RedisManager):
+    """Web Automation tab."""
+    st.header("Web Automation")
+    url = st.text_input("Enter URL to test:")
+    if st.button("Run Tests"):
+        if url:
+            # Check if test results exist in Redis
+            url_key = normalize_web_url(url)
+            cached_results = redis_manager.get_web_test_result(url_key)
+            
+            if cached_results:
+                st.info("Using cached test results")
+                render_web_results(cached_results)
+            else:
+                # Run new tests on the shared browser
+                with st.status("Running web automation tests...") as status:
+                    test_results = run_web_tests(url, status)
+                    failed = test_results.get("status") == "error"
+                    status.update(
+                        label="Web automation tests failed" if failed else "Web automation tests complete",
+                        state="error" if failed else "complete"
+                    )
+                if failed:
+                    st.error(f"Error running web automation tests: {test_results['error']}")
+                
+                # Store in Redis
+                redis_manager.store_web_test_result(url_key, test_results)
+                
+                # Display results
+                render_web_results(test_results)
+        else:
+            st.warning("Please enter a URL to test.")
+
+@st.fragment
+def model_management_tab(model_manager: ModelManager):
+    """Model Management tab."""
+    st.header("Model Management")
+    task_type = st.selectbox(
+        "Select Task Type",
+        ["code_analysis", "bug_detection", "code_refactoring"]
+    )
+    if st.button("Get Model Config"):
+        config = model_manager.get_model_config(task_type)
+        st.json(config)
+    
+    # Usage Statistics
+    st.subheader("Model Usage Statistics")
+    usage_stats = model_manager.get_usage_stats()
+    st.json(usage_stats)
+
+@st.fragment
+def preferences_sidebar(redis_manager: RedisManager, user_id: str, user_session: dict):
+    """User preferences in the sidebar."""
+    st.header("User Preferences")
+    
+    # User preferences are loaded once per session with the rest of the user state
+    user_prefs = user_session["preferences"] or {}
+    
+    # Preference options
+    theme = st.selectbox(
+        "Theme",
+        ["Light", "Dark"],
+        index=0 if user_prefs.get("theme") == "Light" else 1
+    )
+    
+    analysis_depth = st.slider(
+        "Analysis Depth",
+        1, 5,
+        value=user_prefs.get("analysis_depth", 3)
+    )
+    
+    # Save preferences
+    if st.button("Save Preferences"):
+        preferences = {
+            "theme": theme,
+            "analysis_depth": analysis_depth,
+            "last_updated": datetime.now().isoformat()
+        }
+        redis_manager.store_user_preferences(user_id, preferences)
+        user_session["preferences"] = preferences
+        st.success("Preferences saved!")
 
 def main():
     """Main function to run the Streamlit app"""
     logger.info("Starting GitHub AI Analyzer app")
     
+    # Set page config; must be the first Streamlit command of the script
+    st.set_page_config(
+        page_title="GitHub AI Analyzer",
+        page_icon="🤖",
+        layout="wide"
+    )
+    
     try:
-        # Initialize Redis
-        redis_manager = RedisManager()
-        
-        # Initialize components
-        github_analyzer = GitHubAnalyzer()
-        web_automation = WebAutomation()
-        code_reviewer = CodeReviewAgent()
+        # Shared components (cached across reruns)
+        redis_manager = get_redis_manager()
+        github_analyzer = get_github_analyzer()
+        code_reviewer = get_code_reviewer()
+        model_manager = get_model_manager()
         
-        # Initialize agents and managers
-        model_manager = ModelManager()
+        # Per-user state, fetched from Redis in a single batch once per session;
+        # reruns read it from session_state instead of going back to Redis
+        user_id = "default_user"  # In a real app, this would be from authentication
+        if "user_session" not in st.session_state:
+            st.session_state.user_session = redis_manager.get_user_session(user_id)
+        user_session = st.session_state.user_session
         
         logger.info("Successfully initialized all components")
     except Exception as e:
@@ -45,21 +330,18 @@ def main():
         st.error(f"Error initializing components: {e}")
         return
     
-    # Set page config
-    st.set_page_config(
-        page_title="GitHub AI Analyzer",
-        page_icon="🤖",
-        layout="wide"
-    )
-    
     # Sidebar
     st.sidebar.title("Settings")
     st.sidebar.markdown("### Configuration")
     
     # API Keys
-    openai_key = st.sidebar.text_input("OpenAI API Key", type="password", value=os.getenv("OPENAI_API_KEY", ""))
-    github_token = st.sidebar.text_input("GitHub Token", type="password", value=os.getenv("GITHUB_TOKEN", ""))
-    github_username = st.sidebar.text_input("GitHub Username", value=os.getenv("GITHUB_USERNAME", ""))
+    openai_key = st.sidebar.text_input("OpenAI API Key", type="password", value=get_env("OPENAI_API_KEY", ""))
+    github_token = st.sidebar.text_input("GitHub Token", type="password", value=get_env("GITHUB_TOKEN", ""))
+    github_username = st.sidebar.text_input("GitHub Username", value=get_env("GITHUB_USERNAME", ""))
+    
+    # Model usage
+    with st.sidebar:
+        render_usage_sidebar(model_manager)
     
     # Main content
     st.markdown("""
@@ -82,155 +364,19 @@ def main():
     
     # GitHub Analysis Tab
     with tab1:
-        st.header("GitHub Repository Analysis")
-        repo_url = st.text_input("Enter GitHub Repository URL:", placeholder="https://github.com/username/repo")
-        if st.button("Analyze Repository"):
-            if repo_url:
-                with st.spinner("Analyzing repository..."):
-                    # Check if analysis exists in Redis
-                    cached_analysis = redis_manager.get_analysis_result(repo_url)
-                    
-                    if cached_analysis:
-                        st.info("Using cached repository analysis")
-                        st.json(cached_analysis)
-                    else:
-                        # Perform new analysis
-                        analysis_results = github_analyzer.analyze_repository(repo_url)
-                        
-                        # Store in Redis
-                        redis_manager.store_analysis_result(repo_url, analysis_results)
-                        
-                        # Display repository information
-                        st.subheader("Repository Information")
-                        repo_info = analysis_results.get("repository", {})
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Stars", repo_info.get("stars", 0))
-                            st.metric("Forks", repo_info.get("forks", 0))
-                        with col2:
-                            st.metric("Open Issues", repo_info.get("issues", 0))
-                            st.metric("Language", repo_info.get("language", "Unknown"))
-                        with col3:
-                            st.metric("Created", repo_info.get("created_at", "Unknown"))
-                            st.metric("Last Updated", repo_info.get("updated_at", "Unknown"))
-                        
-                        # Display code analysis
-                        st.subheader("Code Analysis")
-                        code_analysis = analysis_results.get("code_analysis", {})
-                        st.metric("Total Files", code_analysis.get("total_files", 0))
-                        st.metric("Total Lines", code_analysis.get("total_lines", 0))
-                        
-                        # Display issues
-                        if code_analysis.get("issues"):
-                            st.subheader("Issues Found")
-                            for issue in code_analysis["issues"]:
-                                st.warning(f"{issue['type'].title()} Issue: {issue['message']}")
-                        
-                        # Display security analysis
-                        st.subheader("Security Analysis")
-                        security = analysis_results.get("security_analysis", {})
-                        if security.get("vulnerabilities"):
-                            st.error("Security Vulnerabilities Found!")
-                            for vuln in security["vulnerabilities"]:
-                                st.error(f"Vulnerability: {vuln}")
-                        
-                        # Display dependency analysis
-                        st.subheader("Dependency Analysis")
-                        deps = analysis_results.get("dependency_analysis", {})
-                        if deps.get("dependencies"):
-                            st.write("Dependencies:")
-                            for file, packages in deps["dependencies"].items():
-                                st.write(f"**{file}:**")
-                                for pkg, version in packages.items():
-                                    st.write(f"- {pkg}: {version}")
-                        
-                        # Display test coverage
-                        st.subheader("Test Coverage")
-                        tests = analysis_results.get("test_coverage", {})
-                        if tests.get("test_files"):
-                            st.write("Test Files Found:")
-                            for file in tests["test_files"]:
-                                st.write(f"- {file}")
-                        
-                        # Display documentation
-                        st.subheader("Documentation")
-                        docs = analysis_results.get("documentation", {})
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("README", "✅" if docs.get("has_readme") else "❌")
-                        with col2:
-                            st.metric("Contributing", "✅" if docs.get("has_contributing") else "❌")
-                        with col3:
-                            st.metric("License", "✅" if docs.get("has_license") else "❌")
-            else:
-                st.warning("Please enter a GitHub repository URL.")
+        github_tab(redis_manager, github_analyzer, user_id, user_session)
     
     # Code Review Tab
     with tab2:
-        st.header("Code Review")
-        code_input = st.text_area("Enter code to analyze:", height=200)
-        if st.button("Analyze Code"):
-            if code_input:
-                with st.spinner("Analyzing code..."):
-                    # Check if analysis exists in Redis
-                    code_id = hash(code_input)
-                    cached_analysis = redis_manager.get_code_analysis(code_id)
-                    
-                    if cached_analysis:
-                        st.info("Using cached analysis")
-                        st.json(cached_analysis)
-                    else:
-                        # Perform new analysis
-                        analysis_results = code_reviewer.analyze_code(code_input)
-                        
-                        # Store in Redis
-                        redis_manager.store_code_analysis(code_id, analysis_results)
-                        
-                        # Display results
-                        st.json(analysis_results)
-            else:
-                st.warning("Please enter some code to analyze.")
+        code_review_tab(redis_manager, code_reviewer)
     
     # Web Automation Tab
     with tab3:
-        st.header("Web Automation")
-        url = st.text_input("Enter URL to test:")
-        if st.button("Run Tests"):
-            if url:
-                with st.spinner("Running web automation tests..."):
-                    # Check if test results exist in Redis
-                    cached_results = redis_manager.get_web_test_result(url)
-                    
-                    if cached_results:
-                        st.info("Using cached test results")
-                        st.json(cached_results)
-                    else:
-                        # Run new tests
-                        test_results = web_automation.run_automated_tests(url)
-                        
-                        # Store in Redis
-                        redis_manager.store_web_test_result(url, test_results)
-                        
-                        # Display results
-                        st.json(test_results)
-            else:
-                st.warning("Please enter a URL to test.")
+        web_automation_tab(redis_manager)
     
     # Model Management Tab
     with tab4:
-        st.header("Model Management")
-        task_type = st.selectbox(
-            "Select Task Type",
-            ["code_analysis", "bug_detection", "code_refactoring"]
-        )
-        if st.button("Get Model Config"):
-            config = model_manager.get_model_config(task_type)
-            st.json(config)
-        
-        # Usage Statistics
-        st.subheader("Model Usage Statistics")
-        usage_stats = model_manager.get_usage_stats()
-        st.json(usage_stats)
+        model_management_tab(model_manager)
     
     # Footer
     st.markdown("---")
@@ -242,34 +388,7 @@ def main():
     
     # Add sidebar for user preferences
     with st.sidebar:
-        st.header("User Preferences")
-        
-        # Get user preferences from Redis
-        user_id = "default_user"  # In a real app, this would be from authentication
-        user_prefs = redis_manager.get_user_preferences(user_id) or {}
-        
-        # Preference options
-        theme = st.selectbox(
-            "Theme",
-            ["Light", "Dark"],
-            index=0 if user_prefs.get("theme") == "Light" else 1
-        )
-        
-        analysis_depth = st.slider(
-            "Analysis Depth",
-            1, 5,
-            value=user_prefs.get("analysis_depth", 3)
-        )
-        
-        # Save preferences
-        if st.button("Save Preferences"):
-            preferences = {
-                "theme": theme,
-                "analysis_depth": analysis_depth,
-                "last_updated": datetime.now().isoformat()
-            }
-            redis_manager.store_user_preferences(user_id, preferences)
-            st.success("Preferences saved!")
+        preferences_sidebar(redis_manager, user_id, user_session)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -2,7 +2,17 @@
 Utility modules for GitHub AI Analyzer
 """
 
-# Make key utility classes available at the package level
-from .github_analyzer import GitHubAnalyzer
-from .web_automation import WebAutomation
-from .redis_manager import RedisManager
\ No newline at end of file
+import importlib
+
+# Make key utility classes available at the package level, loaded on first use
+_EXPORTS = {
+    "GitHubAnalyzer": ".github_analyzer",
+    "WebAutomation": ".web_automation",
+    "RedisManager": ".redis_manager",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
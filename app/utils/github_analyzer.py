@@ -1,19 +1,101 @@
-import os
-import tempfile
-import shutil
-from typing import List, Dict, Any
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from urllib.parse import quote
+from cachetools import LRUCache
 import logging
-from github import Github
-from app.core.config import settings
+from app.core.file_patterns import TEST_PATH_PATTERN
+from app.core.github_client import API_URL, RAW_URL, get_http_session, graphql_query
+from app.utils.redis_manager import RedisManager
 import streamlit as st
 
 logger = logging.getLogger(__name__)
 
+# Dependency manifests fetched with the repository query, keyed by GraphQL alias
+_DEPENDENCY_FILES = {
+    "requirements": "requirements.txt",
+    "packageJson": "package.json",
+    "pomXml": "pom.xml",
+    "buildGradle": "build.gradle",
+    "cargoToml": "Cargo.toml",
+    "goMod": "go.mod"
+}
+
+# Extensions of the source files included in the codebase scan; the
+# extension doubles as the language key
+_SOURCE_EXTENSIONS = frozenset({'py', 'js', 'java', 'cpp', 'c', 'h', 'cs', 'go', 'rs'})
+
+# Source files larger than this are counted as skipped, not downloaded
+MAX_SCAN_FILE_SIZE = 2 * 1024 * 1024
+
+# Workers that each download and scan one file; shared by all analyses, so
+# the pool size also caps raw downloads in flight
+BLOB_FETCH_CONCURRENCY = 16
+_scan_executor = ThreadPoolExecutor(max_workers=BLOB_FETCH_CONCURRENCY, thread_name_prefix="codebase-scan")
+
+# Issue markers, searched for in the raw file bytes. A bytes containment check
+# runs CPython's memchr-accelerated fastsearch, which beats a single regex
+# alternation pass by more than an order of magnitude.
+_EVAL_MARKER = b"eval("
+_LOOP_MARKER = b"while True:"
+_BREAK_MARKER = b"break"
+
+# Per-file scan results keyed by (blob sha, language) and shared across
+# analyses, so files unchanged since an earlier analysis are neither
+# downloaded nor rescanned
+SCAN_CACHE_SIZE = 50_000
+_scan_cache = LRUCache(maxsize=SCAN_CACHE_SIZE)
+_scan_cache_lock = threading.Lock()
+
+# Cached analyses younger than this are served without asking GitHub
+REVALIDATE_AFTER = 60  # seconds
+
+# Metadata, root listing, security alerts and dependency manifests in a single
+# round trip instead of one REST call per file; the recursive file listing
+# comes from the git trees API
+_REPOSITORY_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    owner { login }
+    description
+    stargazerCount
+    forkCount
+    issues(states: OPEN) { totalCount }
+    primaryLanguage { name }
+    createdAt
+    updatedAt
+    pushedAt
+    defaultBranchRef { name }
+    vulnerabilityAlerts(first: 100, states: OPEN) {
+      nodes {
+        securityVulnerability { package { name } }
+        securityAdvisory { summary severity }
+      }
+    }
+    root: object(expression: "HEAD:") { ... on Tree { entries { name type } } }
+%s
+  }
+}
+""" % "\n".join(
+    f'    {alias}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+    for alias, path in _DEPENDENCY_FILES.items()
+)
+
+# Revalidates a cached analysis: metadata edits bump updatedAt, pushes pushedAt
+_FRESHNESS_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) { updatedAt pushedAt }
+}
+"""
+
 class GitHubAnalyzer:
-    def __init__(self):
-        """Initialize GitHub analyzer with authentication."""
-        self.github = Github(settings.GITHUB_TOKEN)
-        self.temp_dir = tempfile.mkdtemp()
+    def __init__(self, redis_manager: Optional[RedisManager] = None):
+        """Initialize GitHub analyzer with an optional result cache."""
+        self.redis_manager = redis_manager
 
     async def analyze_repository(self, repo_url: str) -> Dict[str, Any]:
         """
@@ -28,41 +110,56 @@ class GitHubAnalyzer:
         try:
             with st.spinner(f"Analyzing repository: {repo_url}"):
                 # Extract repository details
-                repo_name = repo_url.split("/")[-1]
-                owner = repo_url.split("/")[-2]
+                repo_name = repo_url.rstrip("/").split("/")[-1]
+                owner = repo_url.rstrip("/").split("/")[-2]
                 
-                # Get repository
-                repo = self.github.get_repo(f"{owner}/{repo_name}")
+                # Repository names are case-insensitive
+                cache_key = f"{owner}/{repo_name}".lower()
+                cached = await asyncio.to_thread(self._get_valid_cached, cache_key, owner, repo_name)
+                if cached is not None:
+                    return cached
                 
-                # Clone repository
-                clone_path = os.path.join(self.temp_dir, repo_name)
-                if os.path.exists(clone_path):
-                    shutil.rmtree(clone_path)
-                repo.clone(clone_path)
+                # One GraphQL round trip covers the metadata; it runs while the
+                # recursive tree is listed and the codebase scanned. A failed scan
+                # only costs its own sections.
+                metadata = asyncio.create_task(asyncio.to_thread(self._graphql_fetch, owner, repo_name))
+                try:
+                    tree_files = await asyncio.to_thread(self._list_tree_files, owner, repo_name)
+                    code_analysis = await self._analyze_codebase(owner, repo_name, tree_files)
+                except Exception as e:
+                    logger.error(f"Error scanning codebase: {str(e)}")
+                    tree_files = {}
+                    code_analysis = {"error": str(e)}
+                repo_data = await metadata
+                root_entries = {
+                    entry["name"]: entry["type"]
+                    for entry in ((repo_data.get("root") or {}).get("entries") or [])
+                }
                 
-                # Analyze repository
+                # Assemble results
                 results = {
                     "repository": {
-                        "name": repo.name,
-                        "owner": repo.owner.login,
-                        "description": repo.description,
-                        "stars": repo.stargazers_count,
-                        "forks": repo.forks_count,
-                        "issues": repo.open_issues_count,
-                        "language": repo.language,
-                        "created_at": repo.created_at.isoformat(),
-                        "updated_at": repo.updated_at.isoformat()
+                        "name": repo_data["name"],
+                        "owner": repo_data["owner"]["login"],
+                        "description": repo_data["description"],
+                        "stars": repo_data["stargazerCount"],
+                        "forks": repo_data["forkCount"],
+                        "issues": repo_data["issues"]["totalCount"],
+                        "language": (repo_data.get("primaryLanguage") or {}).get("name"),
+                        "created_at": repo_data["createdAt"],
+                        "updated_at": repo_data["updatedAt"],
+                        "pushed_at": repo_data["pushedAt"],
+                        "default_branch": (repo_data.get("defaultBranchRef") or {}).get("name")
                     },
-                    "code_analysis": await self._analyze_codebase(clone_path),
-                    "security_analysis": await self._analyze_security(repo),
-                    "dependency_analysis": await self._analyze_dependencies(repo),
-                    "test_coverage": await self._analyze_test_coverage(repo),
-                    "documentation": await self._analyze_documentation(repo)
+                    "code_analysis": code_analysis,
+                    "security_analysis": self._analyze_security(repo_data, root_entries),
+                    "dependency_analysis": self._analyze_dependencies(repo_data),
+                    "test_coverage": self._analyze_test_coverage(list(tree_files)),
+                    "documentation": self._analyze_documentation(root_entries)
                 }
                 
-                # Cleanup
-                shutil.rmtree(clone_path)
-                
+                if self.redis_manager is not None:
+                    self.redis_manager.store_analysis_result(cache_key, results)
                 return results
                 
         except Exception as e:
@@ -73,8 +170,116 @@ class GitHubAnalyzer:
                 "repository_url": repo_url
             }
 
-    async def _analyze_codebase(self, repo_path: str) -> Dict[str, Any]:
-        """Analyze the codebase for quality and issues."""
+    def _get_valid_cached(self, cache_key: str, owner: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached analysis if the repository has not changed since.
+        
+        Recent entries are trusted as is; older ones cost one small GraphQL
+        query comparing updatedAt/pushedAt instead of a full re-analysis.
+        """
+        if self.redis_manager is None:
+            return None
+        cached = self.redis_manager.get_analysis_result(cache_key)
+        if not cached or "repository" not in cached:
+            return None
+        
+        stored_at = cached.get("timestamp")
+        if stored_at and (datetime.now() - datetime.fromisoformat(stored_at)).total_seconds() < REVALIDATE_AFTER:
+            return cached
+        
+        try:
+            current = graphql_query(_FRESHNESS_QUERY, {"owner": owner, "name": name})["repository"]
+        except Exception as e:
+            logger.warning(f"Could not revalidate cached analysis for {cache_key}: {str(e)}")
+            return None
+        repo_info = cached["repository"]
+        if not current or (current["updatedAt"], current["pushedAt"]) != (repo_info.get("updated_at"), repo_info.get("pushed_at")):
+            return None
+        
+        # Unchanged: restart the freshness window and the cache TTL
+        self.redis_manager.store_analysis_result(cache_key, cached)
+        return cached
+
+    def _graphql_fetch(self, owner: str, name: str) -> Dict[str, Any]:
+        """Fetch everything the metadata analyses need in one GraphQL query."""
+        # Vulnerability alerts need extra token permissions; keep the rest if they fail
+        data = graphql_query(_REPOSITORY_QUERY, {"owner": owner, "name": name}, allow_partial=True)
+        if not data.get("repository"):
+            raise ValueError(f"Repository {owner}/{name} not found")
+        return data["repository"]
+
+    async def _analyze_codebase(self, owner: str, name: str, files: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Fetch and scan the repository's source files in parallel, without cloning."""
+        loop = asyncio.get_running_loop()
+        scans = []
+        pending = []
+        skipped = 0
+        for path, entry in files.items():
+            lang = path.rpartition('.')[2]
+            if lang not in _SOURCE_EXTENSIONS:
+                continue
+            # Minified bundles and vendored data say nothing about code quality
+            if entry["size"] > MAX_SCAN_FILE_SIZE:
+                skipped += 1
+                continue
+            cache_key = (entry["sha"], lang)
+            with _scan_cache_lock:
+                scan = _scan_cache.get(cache_key)
+            if scan is not None:
+                scans.append(scan)
+            else:
+                pending.append(loop.run_in_executor(_scan_executor, self._scan_file, owner, name, path, lang, cache_key))
+        
+        scans.extend(scan for scan in await asyncio.gather(*pending) if scan is not None)
+        results = self._merge_file_scans(scans)
+        results["skipped_large_files"] = skipped
+        return results
+
+    def _scan_file(self, owner: str, name: str, path: str, lang: str, cache_key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Download and scan one file on a worker thread; None if it can't be fetched."""
+        try:
+            content = self._fetch_raw(owner, name, path)
+        except Exception as e:
+            logger.warning(f"Skipping {path}: {str(e)}")
+            return None
+        # The scan works on the raw bytes: newlines are counted rather than
+        # split out, and nothing is decoded
+        lines = content.count(b"\n")
+        if content and not content.endswith(b"\n"):
+            lines += 1
+        scan = {
+            "language": lang,
+            "lines": lines,
+            "issues": self._check_code_issues(content, lang)
+        }
+        with _scan_cache_lock:
+            _scan_cache[cache_key] = scan
+        return scan
+
+    def _list_tree_files(self, owner: str, name: str) -> Dict[str, Dict[str, Any]]:
+        """Map every file path at HEAD to its blob sha and size, with a single recursive tree request."""
+        response = get_http_session().get(
+            f"{API_URL}/repos/{owner}/{name}/git/trees/HEAD",
+            params={"recursive": 1},
+            timeout=30
+        )
+        response.raise_for_status()
+        tree = response.json()
+        if tree.get("truncated"):
+            logger.warning(f"Tree listing for {owner}/{name} is truncated; analyzing a partial codebase")
+        return {
+            entry["path"]: {"sha": entry["sha"], "size": entry.get("size", 0)}
+            for entry in tree["tree"] if entry["type"] == "blob"
+        }
+
+    def _fetch_raw(self, owner: str, name: str, path: str) -> bytes:
+        """Download one file's contents at HEAD, undecoded."""
+        response = get_http_session().get(f"{RAW_URL}/{owner}/{name}/HEAD/{quote(path)}", timeout=30)
+        response.raise_for_status()
+        return response.content
+
+    def _merge_file_scans(self, scans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-file scans into codebase totals."""
         results = {
             "total_files": 0,
             "total_lines": 0,
@@ -82,30 +287,23 @@ class GitHubAnalyzer:
             "complexity": {},
             "issues": []
         }
+        languages = Counter()
         
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                if file.endswith(('.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.go', '.rs')):
-                    file_path = os.path.join(root, file)
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        results["total_files"] += 1
-                        results["total_lines"] += len(content.splitlines())
-                        
-                        # Language-specific analysis
-                        lang = file.split('.')[-1]
-                        if lang not in results["languages"]:
-                            results["languages"][lang] = 0
-                        results["languages"][lang] += 1
-                        
-                        # Add to issues if any found
-                        issues = self._check_code_issues(content, lang)
-                        if issues:
-                            results["issues"].extend(issues)
+        for scan in scans:
+            results["total_files"] += 1
+            results["total_lines"] += scan["lines"]
+            
+            # Language-specific analysis
+            languages[scan["language"]] += 1
+            
+            # Add to issues if any found
+            if scan["issues"]:
+                results["issues"].extend(scan["issues"])
         
+        results["languages"] = dict(languages)
         return results
 
-    async def _analyze_security(self, repo) -> Dict[str, Any]:
+    def _analyze_security(self, repo_data: Dict[str, Any], root_entries: Dict[str, str]) -> Dict[str, Any]:
         """Analyze repository for security issues."""
         results = {
             "vulnerabilities": [],
@@ -113,24 +311,19 @@ class GitHubAnalyzer:
             "dependencies": {}
         }
         
-        # Check for security advisories
-        try:
-            advisories = repo.get_vulnerability_alert()
-            if advisories:
-                results["vulnerabilities"].extend(advisories)
-        except:
-            pass
+        # Open Dependabot alerts; absent when the token cannot read them
+        alerts = (repo_data.get("vulnerabilityAlerts") or {}).get("nodes") or []
+        for alert in alerts:
+            package = alert["securityVulnerability"]["package"]["name"]
+            advisory = alert["securityAdvisory"]
+            results["vulnerabilities"].append(f"{package} ({advisory['severity'].lower()}): {advisory['summary']}")
         
         # Check for security policy
-        try:
-            security_policy = repo.get_contents("SECURITY.md")
-            results["security_policy"] = True
-        except:
-            results["security_policy"] = False
+        results["security_policy"] = "SECURITY.md" in root_entries
         
         return results
 
-    async def _analyze_dependencies(self, repo) -> Dict[str, Any]:
+    def _analyze_dependencies(self, repo_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze repository dependencies."""
         results = {
             "dependencies": {},
@@ -138,26 +331,15 @@ class GitHubAnalyzer:
             "vulnerable_packages": []
         }
         
-        # Check for dependency files
-        dependency_files = [
-            "requirements.txt",
-            "package.json",
-            "pom.xml",
-            "build.gradle",
-            "Cargo.toml",
-            "go.mod"
-        ]
-        
-        for file in dependency_files:
-            try:
-                content = repo.get_contents(file)
-                results["dependencies"][file] = self._parse_dependencies(content.decoded_content.decode())
-            except:
-                continue
+        # Blob text is null for binary or oversized files
+        for alias, file in _DEPENDENCY_FILES.items():
+            blob = repo_data.get(alias)
+            if blob and blob.get("text") is not None:
+                results["dependencies"][file] = self._parse_dependencies(blob["text"])
         
         return results
 
-    async def _analyze_test_coverage(self, repo) -> Dict[str, Any]:
+    def _analyze_test_coverage(self, tree_paths: List[str]) -> Dict[str, Any]:
         """Analyze test coverage and quality."""
         results = {
             "test_files": [],
@@ -165,76 +347,40 @@ class GitHubAnalyzer:
             "test_framework": None
         }
         
-        # Check for test files
-        test_patterns = [
-            "test_",
-            "_test",
-            "spec_",
-            "_spec",
-            "tests/",
-            "specs/"
-        ]
-        
-        for pattern in test_patterns:
-            try:
-                test_files = repo.get_contents("", ref="main")
-                for file in test_files:
-                    if pattern in file.name:
-                        results["test_files"].append(file.name)
-            except:
-                continue
+        # Check for test files anywhere in the tree
+        results["test_files"] = [path for path in tree_paths if TEST_PATH_PATTERN.search(path)]
         
         return results
 
-    async def _analyze_documentation(self, repo) -> Dict[str, Any]:
+    def _analyze_documentation(self, root_entries: Dict[str, str]) -> Dict[str, Any]:
         """Analyze repository documentation."""
         results = {
-            "has_readme": False,
-            "has_contributing": False,
-            "has_license": False,
+            "has_readme": "README.md" in root_entries,
+            "has_contributing": "CONTRIBUTING.md" in root_entries,
+            "has_license": "LICENSE" in root_entries,
             "documentation_files": []
         }
         
-        # Check for documentation files
-        doc_files = [
-            "README.md",
-            "CONTRIBUTING.md",
-            "LICENSE",
-            "docs/"
-        ]
-        
-        for file in doc_files:
-            try:
-                repo.get_contents(file)
-                if file == "README.md":
-                    results["has_readme"] = True
-                elif file == "CONTRIBUTING.md":
-                    results["has_contributing"] = True
-                elif file == "LICENSE":
-                    results["has_license"] = True
-                else:
-                    results["documentation_files"].append(file)
-            except:
-                continue
+        if root_entries.get("docs") == "tree":
+            results["documentation_files"].append("docs/")
         
         return results
 
-    def _check_code_issues(self, content: str, language: str) -> List[Dict[str, Any]]:
-        """Check code for common issues."""
+    def _check_code_issues(self, content: bytes, language: str) -> List[Dict[str, Any]]:
+        """Check a file's raw bytes for common issues."""
         issues = []
         
-        # Security issues
-        if language == "python":
-            if "eval(" in content:
-                issues.append({
-                    "type": "security",
-                    "severity": "high",
-                    "message": "Use of eval() detected",
-                    "language": language
-                })
+        # Security issues; the codebase scan passes file extensions
+        if language in ("python", "py") and _EVAL_MARKER in content:
+            issues.append({
+                "type": "security",
+                "severity": "high",
+                "message": "Use of eval() detected",
+                "language": language
+            })
         
         # Performance issues
-        if "while True:" in content and "break" not in content:
+        if _LOOP_MARKER in content and _BREAK_MARKER not in content:
             issues.append({
                 "type": "performance",
                 "severity": "medium",
@@ -1,35 +1,92 @@
 import redis
-import json
-import os
+import orjson
+import zstandard
+from cachetools import TTLCache
 import logging
+import threading
 import streamlit as st
 from datetime import datetime
+from app.core.config import get_env
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Stored payloads above this size are zstd-compressed; smaller ones aren't
+# worth the CPU
+COMPRESS_THRESHOLD = 16 * 1024
+ZSTD_LEVEL = 3
+# Every zstd frame starts with these bytes, while JSON never does
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def _dumps(value) -> bytes:
+    """Serialize a value for Redis; dependency maps may have non-string keys."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+def _encode(value) -> bytes:
+    """Serialize a value for storage, compressing large payloads."""
+    data = _dumps(value)
+    if len(data) > COMPRESS_THRESHOLD:
+        return zstandard.compress(data, ZSTD_LEVEL)
+    return data
+
+def _decode(data: bytes) -> bytes:
+    """Return the JSON bytes of a stored payload, decompressing if needed."""
+    if data[:4] == _ZSTD_MAGIC:
+        return zstandard.decompress(data)
+    return data
+
+# Connections shared by every RedisManager in the process, so concurrent
+# sessions draw from one pool instead of each opening their own
+MAX_CONNECTIONS = 64
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_connection_pool() -> redis.ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = redis.ConnectionPool(
+                    host=get_env("REDIS_HOST", "localhost"),
+                    port=int(get_env("REDIS_PORT", 6379)),
+                    db=int(get_env("REDIS_DB", 0)),
+                    password=get_env("REDIS_PASSWORD", None),
+                    max_connections=MAX_CONNECTIONS,
+                    socket_timeout=5,
+                    socket_keepalive=True,
+                    # orjson reads bytes directly; skip the str round trip
+                    decode_responses=False
+                )
+    return _pool
+
+# Redis key prefix, expiry in seconds and in-memory fallback capacity for
+# each kind of stored item
+_BUCKETS = {
+    "analysis_results": ("github_analysis", 3600, 1024),
+    "code_analysis": ("code_analysis", 3600, 2048),
+    "web_tests": ("web_test", 3600, 1024),
+    "user_preferences": ("user_prefs", 86400, 4096),
+    "last_repo": ("last_repo", 86400, 4096),
+    "agent_messages": ("agent_message", 3600, 4096)
+}
+
+def _key(bucket, item_id):
+    """Redis key for an item in a bucket."""
+    return f"{_BUCKETS[bucket][0]}:{item_id}"
+
 class RedisManager:
     def __init__(self):
-        # Initialize in-memory fallback storage
+        # In-memory fallback storage, bounded and expiring like the Redis keys
         self.memory_cache = {
-            "analysis_results": {},
-            "code_analysis": {},
-            "web_tests": {},
-            "user_preferences": {},
-            "agent_messages": {}
+            bucket: TTLCache(maxsize=capacity, ttl=expires)
+            for bucket, (_, expires, capacity) in _BUCKETS.items()
         }
         
         # Try to connect to Redis
         try:
-            self.redis = redis.Redis(
-                host=os.getenv("REDIS_HOST", "localhost"),
-                port=int(os.getenv("REDIS_PORT", 6379)),
-                db=int(os.getenv("REDIS_DB", 0)),
-                password=os.getenv("REDIS_PASSWORD", None),
-                socket_timeout=5,
-                decode_responses=True
-            )
+            self.redis = redis.Redis(connection_pool=_get_connection_pool())
             # Test connection
             self.redis.ping()
             self.redis_available = True
@@ -44,9 +101,21 @@ class RedisManager:
         """Store data in Redis with optional expiration"""
         if self.redis_available:
             try:
-                self.redis.set(key, json.dumps(value))
-                if expires:
-                    self.redis.expire(key, expires)
+                self.redis.set(key, _encode(value), ex=expires)
+                return True
+            except Exception as e:
+                logger.error(f"Error storing in Redis: {e}")
+                return False
+        return False
+    
+    def store_many(self, items, expires=None):
+        """Store several values in one round trip (non-transactional pipeline)"""
+        if self.redis_available and items:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, value in items.items():
+                    pipe.set(key, _encode(value), ex=expires)
+                pipe.execute()
                 return True
             except Exception as e:
                 logger.error(f"Error storing in Redis: {e}")
@@ -59,100 +128,137 @@ class RedisManager:
             try:
                 data = self.redis.get(key)
                 if data:
-                    return json.loads(data)
+                    return orjson.loads(_decode(data))
+            except Exception as e:
+                logger.error(f"Error retrieving from Redis: {e}")
+        return None
+    
+    def get_many(self, keys):
+        """Get several values from Redis in one round trip (MGET); missing keys are None"""
+        if self.redis_available and keys:
+            try:
+                return [orjson.loads(_decode(data)) if data else None for data in self.redis.mget(keys)]
+            except Exception as e:
+                logger.error(f"Error retrieving from Redis: {e}")
+        return [None] * len(keys)
+    
+    def get_raw(self, key):
+        """Get the serialized JSON bytes stored under a key, without parsing them"""
+        if self.redis_available:
+            try:
+                data = self.redis.get(key)
+                return _decode(data) if data else None
             except Exception as e:
                 logger.error(f"Error retrieving from Redis: {e}")
         return None
     
+    def _get_raw_with_fallback(self, bucket, item_id):
+        """Get serialized JSON text from Redis, or serialize the in-memory fallback entry"""
+        raw = self.get_raw(_key(bucket, item_id))
+        if raw is None and item_id in self.memory_cache[bucket]:
+            raw = _dumps(self.memory_cache[bucket][item_id])
+        return raw.decode() if raw is not None else None
+    
+    def _store(self, bucket, item_id, value, timestamp=True):
+        """Store an item in Redis, or in the in-memory fallback if that fails"""
+        if timestamp:
+            value['timestamp'] = datetime.now().isoformat()
+        if not self._store_in_redis(_key(bucket, item_id), value, expires=_BUCKETS[bucket][1]):
+            self.memory_cache[bucket][item_id] = value
+        return True
+    
+    def _get(self, bucket, item_id):
+        """Get an item from Redis, falling back to the in-memory store"""
+        result = self._get_from_redis(_key(bucket, item_id))
+        if result is None:
+            return self.memory_cache[bucket].get(item_id)
+        return result
+    
     # GitHub Analysis Results
     def store_analysis_result(self, repo_url, results):
         """Store GitHub repository analysis results"""
-        key = f"github_analysis:{repo_url}"
-        results['timestamp'] = datetime.now().isoformat()
-        success = self._store_in_redis(key, results, expires=3600)
-        if not success:
-            self.memory_cache["analysis_results"][repo_url] = results
-        return True
+        return self._store("analysis_results", repo_url, results)
     
     def get_analysis_result(self, repo_url):
         """Get GitHub repository analysis results"""
-        key = f"github_analysis:{repo_url}"
-        result = self._get_from_redis(key)
-        if result is None and repo_url in self.memory_cache["analysis_results"]:
-            return self.memory_cache["analysis_results"][repo_url]
-        return result
+        return self._get("analysis_results", repo_url)
+    
+    def get_analysis_result_raw(self, repo_url):
+        """Get GitHub repository analysis results as JSON text"""
+        return self._get_raw_with_fallback("analysis_results", repo_url)
     
     # Code Analysis Results
     def store_code_analysis(self, code_id, results):
         """Store code analysis results"""
-        key = f"code_analysis:{code_id}"
-        results['timestamp'] = datetime.now().isoformat()
-        success = self._store_in_redis(key, results, expires=3600)
-        if not success:
-            self.memory_cache["code_analysis"][code_id] = results
-        return True
+        return self._store("code_analysis", code_id, results)
     
     def get_code_analysis(self, code_id):
         """Get code analysis results"""
-        key = f"code_analysis:{code_id}"
-        result = self._get_from_redis(key)
-        if result is None and code_id in self.memory_cache["code_analysis"]:
-            return self.memory_cache["code_analysis"][code_id]
-        return result
+        return self._get("code_analysis", code_id)
+    
+    def get_code_analysis_raw(self, code_id):
+        """Get code analysis results as JSON text"""
+        return self._get_raw_with_fallback("code_analysis", code_id)
     
     # Web Test Results
     def store_web_test_result(self, url, results):
-        """Store web test results"""
-        key = f"web_test:{url}"
-        results['timestamp'] = datetime.now().isoformat()
-        success = self._store_in_redis(key, results, expires=3600)
-        if not success:
-            self.memory_cache["web_tests"][url] = results
-        return True
+        """Store web test results; they carry their own run timestamp"""
+        return self._store("web_tests", url, results, timestamp=False)
     
     def get_web_test_result(self, url):
         """Get web test results"""
-        key = f"web_test:{url}"
-        result = self._get_from_redis(key)
-        if result is None and url in self.memory_cache["web_tests"]:
-            return self.memory_cache["web_tests"][url]
-        return result
+        return self._get("web_tests", url)
+    
+    def get_web_test_result_raw(self, url):
+        """Get web test results as JSON text"""
+        return self._get_raw_with_fallback("web_tests", url)
     
     # User Preferences
     def store_user_preferences(self, user_id, preferences):
         """Store user preferences"""
-        key = f"user_prefs:{user_id}"
-        preferences['timestamp'] = datetime.now().isoformat()
-        success = self._store_in_redis(key, preferences, expires=86400)
-        if not success:
-            self.memory_cache["user_preferences"][user_id] = preferences
-        return True
+        return self._store("user_preferences", user_id, preferences)
+    
+    def store_last_repo(self, user_id, repo_url):
+        """Remember the last repository a user analyzed"""
+        return self._store("last_repo", user_id, repo_url, timestamp=False)
+    
+    def get_user_session(self, user_id):
+        """Get a user's preferences and last analyzed repository in one round trip"""
+        preferences, last_repo = self.get_many([_key("user_preferences", user_id), _key("last_repo", user_id)])
+        if preferences is None:
+            preferences = self.memory_cache["user_preferences"].get(user_id)
+        if last_repo is None:
+            last_repo = self.memory_cache["last_repo"].get(user_id)
+        return {
+            "preferences": preferences,
+            "last_repo": last_repo
+        }
     
     def get_user_preferences(self, user_id):
         """Get user preferences"""
-        key = f"user_prefs:{user_id}"
-        result = self._get_from_redis(key)
-        if result is None and user_id in self.memory_cache["user_preferences"]:
-            return self.memory_cache["user_preferences"][user_id]
-        return result
+        return self._get("user_preferences", user_id)
     
     # Agent Messages
     def store_agent_message(self, agent_id, message):
         """Store agent message"""
-        key = f"agent_message:{agent_id}"
-        message['timestamp'] = datetime.now().isoformat()
-        success = self._store_in_redis(key, message, expires=3600)
+        return self._store("agent_messages", agent_id, message)
+    
+    def store_agent_messages(self, messages):
+        """Store messages from several agents ({agent_id: message}) in one round trip"""
+        timestamp = datetime.now().isoformat()
+        for message in messages.values():
+            message['timestamp'] = timestamp
+        success = self.store_many(
+            {_key("agent_messages", agent_id): message for agent_id, message in messages.items()},
+            expires=_BUCKETS["agent_messages"][1]
+        )
         if not success:
-            self.memory_cache["agent_messages"][agent_id] = message
+            self.memory_cache["agent_messages"].update(messages)
         return True
     
     def get_agent_message(self, agent_id):
         """Get agent message"""
-        key = f"agent_message:{agent_id}"
-        result = self._get_from_redis(key)
-        if result is None and agent_id in self.memory_cache["agent_messages"]:
-            return self.memory_cache["agent_messages"][agent_id]
-        return result
+        return self._get("agent_messages", agent_id)
     
     def close(self):
         """Close Redis connection."""
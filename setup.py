@@ -7,15 +7,18 @@ setup(
     include_package_data=True,
     python_requires=">=3.9",
     install_requires=[
-        "streamlit==1.24.0",
+        "streamlit==1.37.0",
         "python-dotenv==1.0.0",
         "openai==1.0.0",
         "PyGithub==2.1.1",
         "redis==4.5.0",
-        "selenium==4.11.2",
-        "webdriver-manager==4.0.0",
+        "orjson==3.9.15",
+        "zstandard==0.22.0",
+        "uvloop==0.19.0; sys_platform != 'win32'",
+        "playwright==1.40.0",
         "requests==2.31.0",
         "python-dateutil==2.8.2",
+        "cachetools==5.3.2",
         "pydantic==2.4.2",
         "pydantic-settings==2.0.3",
     ],
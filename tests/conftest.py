@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+from app.agents.code_review_agent import CodeReviewAgent
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run the async tests on uvloop where it is installed."""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
+
+@pytest.fixture(scope="session")
+def code_review_agent():
+    """Create a CodeReviewAgent instance for testing, once per session (per xdist worker)."""
+    return CodeReviewAgent()
+
+@pytest.fixture
+def sample_python_code():
+    return """
+def calculate_sum(numbers):
+    total = 0
+    for i in range(len(numbers)):
+        total += numbers[i]
+    return total
+
+def process_data(data):
+    result = eval(data)
+    return result * 2
+"""
+
+@pytest.fixture
+def sample_javascript_code():
+    return """
+function calculateSum(numbers) {
+    var total = 0;
+    for (var i = 0; i < numbers.length; i++) {
+        total += numbers[i];
+    }
+    return total;
+}
+
+function processData(data) {
+    var result = eval(data);
+    document.write(result);
+    return result * 2;
+}
+"""
@@ -0,0 +1,62 @@
+async def test_analyze_code_python(code_review_agent, sample_python_code):
+    result = await code_review_agent.analyze_code(sample_python_code, "python")
+    
+    assert isinstance(result, dict)
+    assert "timestamp" in result
+    assert "language" in result
+    assert result["language"] == "python"
+    
+    # Check metrics
+    assert "metrics" in result
+    assert isinstance(result["metrics"], dict)
+    assert "lines_of_code" in result["metrics"]
+    
+    # Check security issues
+    assert "security_issues" in result
+    security_issues = result["security_issues"]
+    assert isinstance(security_issues, list)
+    assert any(issue["message"] == "Use of eval() is dangerous" for issue in security_issues)
+    
+    # Check performance issues
+    assert "performance_issues" in result
+    performance_issues = result["performance_issues"]
+    assert isinstance(performance_issues, list)
+    assert any(issue["message"] == "Use enumerate() instead of range(len())" for issue in performance_issues)
+
+async def test_analyze_code_javascript(code_review_agent, sample_javascript_code):
+    result = await code_review_agent.analyze_code(sample_javascript_code, "javascript")
+    
+    assert isinstance(result, dict)
+    assert "timestamp" in result
+    assert "language" in result
+    assert result["language"] == "javascript"
+    
+    # Check security issues
+    assert "security_issues" in result
+    security_issues = result["security_issues"]
+    assert isinstance(security_issues, list)
+    assert any(issue["message"] == "Use of eval() is dangerous" for issue in security_issues)
+    assert any(issue["message"] == "Use of document.write() is dangerous" for issue in security_issues)
+    
+    # Check performance issues
+    assert "performance_issues" in result
+    performance_issues = result["performance_issues"]
+    assert isinstance(performance_issues, list)
+    assert any(issue["message"] == "Use let instead of var in for loops" for issue in performance_issues)
+
+async def test_error_handling(code_review_agent):
+    result = await code_review_agent.analyze_code("", "unknown_language")
+    assert isinstance(result, dict)
+    assert "error" in result
+    assert "timestamp" in result
+
+async def test_analyze_codebase(code_review_agent):
+    """Test codebase analysis."""
+    repo_path = "tests/test_repo"
+    result = await code_review_agent.analyze_codebase(repo_path)
+    
+    assert isinstance(result, dict)
+    assert "status" in result
+    assert "files_analyzed" in result
+    assert "total_issues" in result
+    assert "summary" in result
\ No newline at end of file
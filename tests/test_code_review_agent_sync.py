@@ -1,93 +1,3 @@
-import pytest
-from app.agents.code_review_agent import CodeReviewAgent
-from app.core.model_manager import ModelManager
-import json
-
-@pytest.fixture
-def code_review_agent():
-    """Create a CodeReviewAgent instance for testing."""
-    return CodeReviewAgent()
-
-@pytest.fixture
-def sample_python_code():
-    return """
-def calculate_sum(numbers):
-    total = 0
-    for i in range(len(numbers)):
-        total += numbers[i]
-    return total
-
-def process_data(data):
-    result = eval(data)
-    return result * 2
-"""
-
-@pytest.fixture
-def sample_javascript_code():
-    return """
-function calculateSum(numbers) {
-    var total = 0;
-    for (var i = 0; i < numbers.length; i++) {
-        total += numbers[i];
-    }
-    return total;
-}
-
-function processData(data) {
-    var result = eval(data);
-    document.write(result);
-    return result * 2;
-}
-"""
-
-@pytest.mark.asyncio
-async def test_analyze_code_python(code_review_agent, sample_python_code):
-    result = await code_review_agent.analyze_code(sample_python_code, "python")
-    
-    assert isinstance(result, dict)
-    assert "timestamp" in result
-    assert "language" in result
-    assert result["language"] == "python"
-    
-    # Check metrics
-    assert "metrics" in result
-    assert isinstance(result["metrics"], dict)
-    assert "lines_of_code" in result["metrics"]
-    
-    # Check security issues
-    assert "security_issues" in result
-    security_issues = result["security_issues"]
-    assert isinstance(security_issues, list)
-    assert any(issue["message"] == "Use of eval() is dangerous" for issue in security_issues)
-    
-    # Check performance issues
-    assert "performance_issues" in result
-    performance_issues = result["performance_issues"]
-    assert isinstance(performance_issues, list)
-    assert any(issue["message"] == "Use enumerate() instead of range(len())" for issue in performance_issues)
-
-@pytest.mark.asyncio
-async def test_analyze_code_javascript(code_review_agent, sample_javascript_code):
-    result = await code_review_agent.analyze_code(sample_javascript_code, "javascript")
-    
-    assert isinstance(result, dict)
-    assert "timestamp" in result
-    assert "language" in result
-    assert result["language"] == "javascript"
-    
-    # Check security issues
-    assert "security_issues" in result
-    security_issues = result["security_issues"]
-    assert isinstance(security_issues, list)
-    assert any(issue["message"] == "Use of eval() is dangerous" for issue in security_issues)
-    assert any(issue["message"] == "Use of document.write() is dangerous" for issue in security_issues)
-    
-    # Check performance issues
-    assert "performance_issues" in result
-    performance_issues = result["performance_issues"]
-    assert isinstance(performance_issues, list)
-    assert any(issue["message"] == "Use let instead of var in for loops" for issue in performance_issues)
-
 def test_extract_dependencies_python(code_review_agent):
     code = """
 import os
@@ -147,13 +57,6 @@ def not_a_test():
     assert coverage["unit_tests"] > 0
     assert "total_coverage" in coverage
 
-@pytest.mark.asyncio
-async def test_error_handling(code_review_agent):
-    result = await code_review_agent.analyze_code("", "unknown_language")
-    assert isinstance(result, dict)
-    assert "error" in result
-    assert "timestamp" in result
-
 def test_extract_metrics(code_review_agent):
     """Test metrics extraction."""
     code = """
@@ -256,18 +159,6 @@ def another_function():
     assert "return True" in body
     assert "print(\"Different function\")" not in body
 
-@pytest.mark.asyncio
-async def test_analyze_codebase(code_review_agent):
-    """Test codebase analysis."""
-    repo_path = "tests/test_repo"
-    result = await code_review_agent.analyze_codebase(repo_path)
-    
-    assert isinstance(result, dict)
-    assert "status" in result
-    assert "files_analyzed" in result
-    assert "total_issues" in result
-    assert "summary" in result
-
 def test_language_specific_checks(code_review_agent):
     """Test language-specific code checks."""
     python_code = """
@@ -285,4 +176,20 @@ function jsFunction() {
     
     assert isinstance(python_issues, list)
     assert isinstance(js_issues, list)
-    assert len(python_issues) != len(js_issues)  # Different patterns for different languages 
\ No newline at end of file
+    assert len(python_issues) != len(js_issues)  # Different patterns for different languages 
+
+def test_rule_line_numbers(code_review_agent):
+    """Fused regex and literal rule scans report every line a rule matched on."""
+    code = """x = eval(data)
+os.system("ls")
+for i in range(len(items)):
+    y = eval(items[i])
+for j in range(len(other)):
+    pass
+"""
+    security = {issue["message"]: issue["line_numbers"] for issue in code_review_agent._check_security(code, "python")}
+    assert security["Use of eval() is dangerous"] == [1, 4]
+    assert security["Use of os.system() is dangerous"] == [2]
+    
+    performance = {issue["message"]: issue["line_numbers"] for issue in code_review_agent._check_performance(code, "python")}
+    assert performance["Use enumerate() instead of range(len())"] == [3, 5]
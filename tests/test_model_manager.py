@@ -1,12 +1,21 @@
 import pytest
 from app.core.model_manager import ModelManager
+from app.core.model_defaults import MODEL_DEFAULTS
 from app.core.config import settings
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def model_manager():
-    """Create a ModelManager instance for testing."""
+    """Create a ModelManager instance for testing, once per session."""
     return ModelManager()
 
+@pytest.fixture(autouse=True)
+def restore_model_manager(model_manager):
+    """Return the shared ModelManager to its initial state after each test."""
+    yield
+    model_manager.models = {task: dict(config) for task, config in MODEL_DEFAULTS.items()}
+    model_manager.contexts.clear()
+    model_manager.model_usage.clear()
+
 def test_get_model_config(model_manager):
     """Test getting model configuration."""
     config = model_manager.get_model_config("code_analysis")